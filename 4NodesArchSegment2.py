@@ -6,8 +6,17 @@ import netsquid.qubits.ketstates as ks
 from netsquid.components.models.qerrormodels import FibreLossModel
 from netsquid.components.models import FixedDelayModel
 
-def run_30km_bridge(num_runs=20):
+from qubit_lifecycle import release, discard
+from trial_logging import TrialLog
+
+def run_30km_bridge(num_runs=20, log=None):
+    """
+    Returns the Alice-David fidelity of every run (None where a qubit was lost).
+    Per-run outcomes go to `log` (a trial_logging.TrialLog; default: progress line only).
+    """
+    log = log or TrialLog("4NodesArchSegment2", total=num_runs)
     total_swaps = 0
+    fidelities = []
     
     for i in range(num_runs):
         ns.sim_reset()
@@ -72,14 +81,15 @@ def run_30km_bridge(num_runs=20):
         # 9. Perform the Entanglement Swap at Bob
         q_A = bob.qmemory.peek(0)[0]
         q_C = bob.qmemory.peek(1)[0]
+        f = None
 
         if q_A is not None and q_C is not None:
             ns.qubits.operate([q_A, q_C], ns.CNOT)
             ns.qubits.operate(q_A, ns.H)
-            m1, _ = ns.qubits.measure(q_A)
-            m2, _ = ns.qubits.measure(q_C)
+            m1, _ = ns.qubits.measure(q_A, discard=True)
+            m2, _ = ns.qubits.measure(q_C, discard=True)
             total_swaps += 1
-            # Note: After measurement, q_A and q_C are destroyed (None)
+            # Note: discard=True traces q_A and q_C out of the shared QState
             # 11. Final End-to-End Verification
         # Get the qubit that stayed at Alice (S1) and the one that arrived at David (S3)
         q_alice = s1.peek()[0] # Peek at the first qubit of the S1 pair
@@ -88,10 +98,18 @@ def run_30km_bridge(num_runs=20):
         if q_alice is not None and q_david is not None:
             # Calculate fidelity between the distant pair
             f = ns.qubits.fidelity([q_alice, q_david], ks.b00)
-            print(f"Success! Alice-David Fidelity: {f:.4f}")
 
+        # 12. Release: empty the memories, discard the end pair
+        discard(q_alice)
+        release(bob, charlie, david)
+        fidelities.append(f)
+        log.trial(i, swapped=q_A is not None and q_C is not None, fidelity=f)
+
+    log.close()
     print(f"--- 30km Bridge Results ({num_runs} runs) ---")
     print(f"Successful Swaps: {total_swaps} / {num_runs}")
+    return fidelities
 
 if __name__ == "__main__":
-    run_30km_bridge()
\ No newline at end of file
+    from dispatcher import run_bridge_script
+    run_bridge_script(run_30km_bridge, p_loss_init=0.1, p_loss_length=0.25)
\ No newline at end of file
@@ -6,8 +6,17 @@ import netsquid.qubits.ketstates as ks
 from netsquid.components.models.qerrormodels import FibreLossModel
 from netsquid.components.models import FixedDelayModel
 
-def run_30km_bridge(num_runs=20):
+from qubit_lifecycle import release
+from trial_logging import TrialLog
+
+def run_30km_bridge(num_runs=20, log=None):
+    """
+    Returns the Alice-David fidelity of every run (None where a qubit was lost).
+    Per-run outcomes go to `log` (a trial_logging.TrialLog; default: progress line only).
+    """
+    log = log or TrialLog("4NodesArchSegment2a", total=num_runs)
     total_successful_bridging = 0
+    fidelities = []
     
     for i in range(num_runs):
         ns.sim_reset()
@@ -73,12 +82,13 @@ def run_30km_bridge(num_runs=20):
         # 9. REPEATER LOGIC: Swap at Bob
         q_A = bob.qmemory.peek(0)[0]
         q_C_local = bob.qmemory.peek(1)[0]
+        f = None
 
         if q_A and q_C_local:
             ns.qubits.operate([q_A, q_C_local], ns.CNOT)
             ns.qubits.operate(q_A, ns.H)
-            ns.qubits.measure(q_A)
-            ns.qubits.measure(q_C_local)
+            ns.qubits.measure(q_A, discard=True)
+            ns.qubits.measure(q_C_local, discard=True)
 
             # 10. REPEATER LOGIC: Swap at Charlie
             q_Alice_at_Char = charlie.qmemory.peek(0)[0]
@@ -87,8 +97,8 @@ def run_30km_bridge(num_runs=20):
             if q_Alice_at_Char and q_D_local:
                 ns.qubits.operate([q_Alice_at_Char, q_D_local], ns.CNOT)
                 ns.qubits.operate(q_Alice_at_Char, ns.H)
-                ns.qubits.measure(q_Alice_at_Char)
-                ns.qubits.measure(q_D_local)
+                ns.qubits.measure(q_Alice_at_Char, discard=True)
+                ns.qubits.measure(q_D_local, discard=True)
 
                 # 11. Final Verification (Alice to David)
                 q_alice_final = alice.qmemory.peek(0)[0] 
@@ -97,10 +107,17 @@ def run_30km_bridge(num_runs=20):
                 if q_alice_final and q_david_final:
                     f = ns.qubits.fidelity([q_alice_final, q_david_final], ks.b00)
                     total_successful_bridging += 1
-                    print(f"Run {i}: Bridge Success! Fidelity: {f:.4f}")
 
+        # 12. Release: empty every memory (end pair and unswapped qubits)
+        release(alice, bob, charlie, david)
+        fidelities.append(f)
+        log.trial(i, fidelity=f)
+
+    log.close()
     print(f"\n--- 30km Bridge Results ---")
     print(f"Successes: {total_successful_bridging} / {num_runs}")
+    return fidelities
 
 if __name__ == "__main__":
-    run_30km_bridge()
\ No newline at end of file
+    from dispatcher import run_bridge_script
+    run_bridge_script(run_30km_bridge, p_loss_init=0.1, p_loss_length=0.25)
\ No newline at end of file
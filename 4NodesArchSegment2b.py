@@ -5,9 +5,20 @@ from netsquid.qubits.state_sampler import StateSampler
 import netsquid.qubits.ketstates as ks
 from netsquid.components.models.qerrormodels import FibreLossModel
 from netsquid.components.models import FixedDelayModel
+from netsquid.components.component import Message
 
-def run_30km_bridge(num_runs=20):
+from classical_channels import connect_classical, Inbox
+from qubit_lifecycle import release
+from trial_logging import TrialLog
+
+def run_30km_bridge(num_runs=20, log=None):
+    """
+    Returns the Alice-David fidelity of every run (None where a qubit was lost).
+    Per-run outcomes go to `log` (a trial_logging.TrialLog; default: progress line only).
+    """
+    log = log or TrialLog("4NodesArchSegment2b", total=num_runs)
     total_successful_bridging = 0
+    fidelities = []
     
     for i in range(num_runs):
         ns.sim_reset()
@@ -66,6 +77,11 @@ def run_30km_bridge(num_runs=20):
         c3.ports["recv"].connect(david.ports["in_from_charlie"])
         david.ports["in_from_charlie"].forward_input(david.qmemory.ports["qin0"])
 
+        # 7b. Classical feed-forward links to David (Bob 20km, Charlie 10km away)
+        connect_classical(bob, david, "c_out_david", "c_in_bob", "CC_BD", length=20)
+        connect_classical(charlie, david, "c_out_david", "c_in_charlie", "CC_CD", length=10)
+        from_bob, from_charlie = Inbox(david.ports["c_in_bob"]), Inbox(david.ports["c_in_charlie"])
+
         # 8. Execute
         s1.trigger(); s2.trigger(); s3.trigger()
         ns.sim_run(duration=100000)
@@ -75,11 +91,13 @@ def run_30km_bridge(num_runs=20):
         q_C_local = bob.qmemory.peek(1)[0]
 
         m1, m2 = 0, 0
+        f, feed_forward_ns = None, None
         if q_A and q_C_local:
             ns.qubits.operate([q_A, q_C_local], ns.CNOT)
             ns.qubits.operate(q_A, ns.H)
-            m1, _ = ns.qubits.measure(q_A)
-            m2, _ = ns.qubits.measure(q_C_local)
+            m1, _ = ns.qubits.measure(q_A, discard=True)
+            m2, _ = ns.qubits.measure(q_C_local, discard=True)
+            bob.ports["c_out_david"].tx_output(Message([m1, m2]))
 
             # 10. REPEATER LOGIC: Swap at Charlie
             q_Alice_at_Char = charlie.qmemory.peek(0)[0]
@@ -88,11 +106,17 @@ def run_30km_bridge(num_runs=20):
             if q_Alice_at_Char and q_D_local:
                 ns.qubits.operate([q_Alice_at_Char, q_D_local], ns.CNOT)
                 ns.qubits.operate(q_Alice_at_Char, ns.H)
-                m3, _ = ns.qubits.measure(q_Alice_at_Char)
-                m4, _ = ns.qubits.measure(q_D_local)
+                m3, _ = ns.qubits.measure(q_Alice_at_Char, discard=True)
+                m4, _ = ns.qubits.measure(q_D_local, discard=True)
+                charlie.ports["c_out_david"].tx_output(Message([m3, m4]))
 
                 # 11. FEED-FORWARD CORRECTIONS at David
-                # David applies corrections based on the outcomes of Bob and Charlie
+                # David only knows the outcomes once both messages have arrived
+                swap_time = ns.sim_time()
+                ns.sim_run()
+                m1, m2 = from_bob.items
+                m3, m4 = from_charlie.items
+                feed_forward_ns = max(from_bob.arrivals + from_charlie.arrivals) - swap_time
                 q_david_final = david.qmemory.peek(0)[0]
                 
                 # Correction for Bit Flips (X)
@@ -108,9 +132,18 @@ def run_30km_bridge(num_runs=20):
                 if q_alice_final and q_david_final:
                     f = ns.qubits.fidelity([q_alice_final, q_david_final], ks.b00)
                     total_successful_bridging += 1
-                    print(f"Run {i}: Bridge Success! Corrected Fidelity: {f:.4f}")
+
+        # 13. Release: empty every memory (end pair and unswapped qubits)
+        release(alice, bob, charlie, david)
+        fidelities.append(f)
+        log.trial(i, fidelity=f, feed_forward_ns=feed_forward_ns)
+
+    log.close()
     print(f"\n--- 30km Bridge Results ---")
     print(f"Successes: {total_successful_bridging} / {num_runs}")
+    return fidelities
 
 if __name__ == "__main__":
-    run_30km_bridge()
\ No newline at end of file
+    from dispatcher import run_bridge_script
+    # Classical feed-forward latency is event timing: only run_30km_bridge has it
+    run_bridge_script(run_30km_bridge, p_loss_init=0.1, p_loss_length=0.25, timing=True)
\ No newline at end of file
@@ -1,5 +1,8 @@
 import netsquid as ns
 import netsquid.qubits.ketstates as ks
+
+from resource_states import create_noisy
+from trial_logging import TrialLog
 from netsquid.qubits.qformalism import QFormalism
 
 # Try the most common enum names for Density Matrix mode
@@ -8,30 +11,24 @@ try:
 except AttributeError:
     ns.set_qstate_formalism(QFormalism.DENSITY_MATRIX)
 
-def run_30km_bridge(num_runs=20):
+def run_30km_bridge(num_runs=20, error_prob=0.02, log=None):
+    """Returns the Alice-David fidelity of every run; per-run records go to `log` (a TrialLog)."""
+    log = log or TrialLog("4NodesNoiseModeDensity", total=num_runs)
     total_successful_bridging = 0
+    fidelities = []
     
-    # 2% error probability to ensure we see the decimal drop
-    error_prob = 0.02 
+    # 2% error probability (default) to ensure we see the decimal drop
 
     print("Starting 30km Bridge in Density Matrix Mode...\n")
 
     for i in range(num_runs):
         ns.sim_reset()
         
-        # 1. Create and entangle 6 qubits (3 segments)
-        q1_a, q1_b = ns.qubits.create_qubits(2)
-        q2_b, q2_c = ns.qubits.create_qubits(2)
-        q3_c, q3_d = ns.qubits.create_qubits(2)
-        
-        for pair in [(q1_a, q1_b), (q2_b, q2_c), (q3_c, q3_d)]:
-            ns.qubits.operate(pair[0], ns.H)
-            ns.qubits.operate(pair, ns.CNOT)
-
-        # 2. INJECT HARDWARE NOISE (The "No-Fluff" Reality)
-        # In DM mode, this creates a consistent mixed state
-        for q in [q1_a, q1_b, q2_b, q2_c, q3_c, q3_d]:
-            ns.qubits.depolarize(q, prob=error_prob)
+        # 1-2. Create 3 entangled pairs with HARDWARE NOISE (The "No-Fluff" Reality)
+        # In DM mode the cached depolarized Bell DM is assigned directly
+        q1_a, q1_b = create_noisy("bell", noise="depolarize", prob=error_prob)
+        q2_b, q2_c = create_noisy("bell", noise="depolarize", prob=error_prob)
+        q3_c, q3_d = create_noisy("bell", noise="depolarize", prob=error_prob)
 
         # 3. SWAP AT BOB
         ns.qubits.operate([q1_b, q2_b], ns.CNOT)
@@ -54,11 +51,16 @@ def run_30km_bridge(num_runs=20):
 
         # 6. FINAL VERIFICATION
         f = ns.qubits.fidelity([q1_a, q3_d], ks.b00)
+        fidelities.append(f)
         total_successful_bridging += 1
-        print(f"Run {i}: Realistic Fidelity: {f:.4f}")
+        log.trial(i, fidelity=f)
 
+    log.close()
     print(f"\n--- 30km Bridge Results ---")
     print(f"Successes: {total_successful_bridging} / {num_runs}")
+    print(f"Mean Fidelity: {sum(fidelities) / max(len(fidelities), 1):.4f}")
+    return fidelities
 
 if __name__ == "__main__":
-    run_30km_bridge()
\ No newline at end of file
+    from dispatcher import run_bridge_script
+    run_bridge_script(run_30km_bridge, depolar_rate=0.02)
@@ -1,8 +1,18 @@
 import netsquid as ns
 import netsquid.qubits.ketstates as ks
 
-def run_30km_bridge(num_runs=20):
+from resource_states import create_noisy
+from trial_logging import TrialLog
+
+def run_30km_bridge(num_runs=20, log=None):
+    """
+    Returns the Alice-David fidelity of every run.
+    Per-run records go to `log` (a trial_logging.TrialLog; default: progress line only).
+    """
+    log = log or TrialLog("4NodesNoiseModeba", total=num_runs)
     total_successful_bridging = 0
+    fidelity_sum = 0.0
+    fidelities = []
     
     # INCREASED NOISE: 5% to make the effect visible in a small sample
     error_prob = 0.05 
@@ -12,18 +22,11 @@ def run_30km_bridge(num_runs=20):
     for i in range(num_runs):
         ns.sim_reset()
         
-        # 1. Create and entangle 6 qubits
-        q1_a, q1_b = ns.qubits.create_qubits(2)
-        q2_b, q2_c = ns.qubits.create_qubits(2)
-        q3_c, q3_d = ns.qubits.create_qubits(2)
-        
-        for pair in [(q1_a, q1_b), (q2_b, q2_c), (q3_c, q3_d)]:
-            ns.qubits.operate(pair[0], ns.H)
-            ns.qubits.operate(pair, ns.CNOT)
-
-        # 2. INJECT NOISE (Hardware Reality)
-        for q in [q1_a, q1_b, q2_b, q2_c, q3_c, q3_d]:
-            ns.qubits.depolarize(q, prob=error_prob)
+        # 1-2. Create 3 entangled pairs with NOISE (Hardware Reality),
+        # assigned from the precomputed resource-state cache
+        q1_a, q1_b = create_noisy("bell", noise="depolarize", prob=error_prob)
+        q2_b, q2_c = create_noisy("bell", noise="depolarize", prob=error_prob)
+        q3_c, q3_d = create_noisy("bell", noise="depolarize", prob=error_prob)
 
         # 3. SWAP AT BOB
         ns.qubits.operate([q1_b, q2_b], ns.CNOT)
@@ -46,11 +49,16 @@ def run_30km_bridge(num_runs=20):
         f = ns.qubits.fidelity([q1_a, q3_d], ks.b00)
         
         total_successful_bridging += 1
-        # Format to 4 decimal places to see the noise impact
-        print(f"Run {i}: Realistic Fidelity: {f:.4f}")
+        fidelity_sum += f
+        fidelities.append(f)
+        log.trial(i, fidelity=f)
 
+    log.close()
     print(f"\n--- 30km Bridge Results ---")
     print(f"Successes: {total_successful_bridging} / {num_runs}")
+    print(f"Mean Fidelity: {fidelity_sum / max(total_successful_bridging, 1):.4f}")
+    return fidelities
 
 if __name__ == "__main__":
-    run_30km_bridge()
\ No newline at end of file
+    from dispatcher import run_bridge_script
+    run_bridge_script(run_30km_bridge, depolar_rate=0.05)
\ No newline at end of file
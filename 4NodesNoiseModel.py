@@ -1,21 +1,30 @@
 import netsquid as ns
 from netsquid.nodes import Node
 from netsquid.components import QuantumChannel, QSource, SourceStatus, QuantumMemory
-from netsquid.qubits.state_sampler import StateSampler
 import netsquid.qubits.ketstates as ks
 from netsquid.components.models.qerrormodels import FibreLossModel, DepolarNoiseModel
 from netsquid.components.models import FixedDelayModel
 
-def run_30km_bridge(num_runs=20):
+from qubit_lifecycle import release
+from resource_states import state_sampler
+from trial_logging import TrialLog
+
+def run_30km_bridge(num_runs=20, depolar_rate=0.01, p_loss_init=0.1, p_loss_length=0.25, log=None):
+    """
+    Returns the Alice-David fidelity of every run (None where a qubit was lost).
+    Per-run records go to `log` (a trial_logging.TrialLog; default: progress line only).
+    """
+    log = log or TrialLog("4NodesNoiseModel", total=num_runs)
     total_successful_bridging = 0
+    fidelities = []
     
     # 1. Setup Models
-    loss_model = FibreLossModel(p_loss_init=0.1, p_loss_length=0.25) 
+    loss_model = FibreLossModel(p_loss_init=p_loss_init, p_loss_length=p_loss_length) 
     delay_model = FixedDelayModel(delay=5000) # 5 microseconds of travel
     
     # Aggressive noise model to FORCE a visible drop (1% per channel)
     # Using time_independent=True here because we want it to hit the qubit on arrival
-    noise_model = DepolarNoiseModel(depolar_rate=0.01, time_independent=True)
+    noise_model = DepolarNoiseModel(depolar_rate=depolar_rate, time_independent=True)
 
     for i in range(num_runs):
         ns.sim_reset()
@@ -41,8 +50,8 @@ def run_30km_bridge(num_runs=20):
             "loss_model": loss_model, 
             "quantum_noise_model": noise_model})
         
-        # 4. Sources
-        sampler = StateSampler([ks.b00])
+        # 4. Sources (cached |b00> sampler, shared across runs)
+        sampler = state_sampler("bell")
         s1 = QSource("S1", state_sampler=sampler, num_ports=2, status=SourceStatus.EXTERNAL)
         s2 = QSource("S2", state_sampler=sampler, num_ports=2, status=SourceStatus.EXTERNAL)
         s3 = QSource("S3", state_sampler=sampler, num_ports=2, status=SourceStatus.EXTERNAL)
@@ -72,6 +81,7 @@ def run_30km_bridge(num_runs=20):
         # 6. Run
         s1.trigger(); s2.trigger(); s3.trigger()
         ns.sim_run()
+        fidelities.append(None)
 
         # 7. Bob Swap
         q_A = bob.qmemory.peek(0)[0]
@@ -79,8 +89,8 @@ def run_30km_bridge(num_runs=20):
         if q_A and q_C_local:
             ns.qubits.operate([q_A, q_C_local], ns.CNOT)
             ns.qubits.operate(q_A, ns.H)
-            m1, _ = ns.qubits.measure(q_A)
-            m2, _ = ns.qubits.measure(q_C_local)
+            m1, _ = ns.qubits.measure(q_A, discard=True)
+            m2, _ = ns.qubits.measure(q_C_local, discard=True)
 
             # 8. Charlie Swap
             q_Alice_at_Char = charlie.qmemory.peek(0)[0]
@@ -88,8 +98,8 @@ def run_30km_bridge(num_runs=20):
             if q_Alice_at_Char and q_D_local:
                 ns.qubits.operate([q_Alice_at_Char, q_D_local], ns.CNOT)
                 ns.qubits.operate(q_Alice_at_Char, ns.H)
-                m3, _ = ns.qubits.measure(q_Alice_at_Char)
-                m4, _ = ns.qubits.measure(q_D_local)
+                m3, _ = ns.qubits.measure(q_Alice_at_Char, discard=True)
+                m4, _ = ns.qubits.measure(q_D_local, discard=True)
 
                 # 9. David Corrections
                 q_david_final = david.qmemory.peek(0)[0]
@@ -101,10 +111,18 @@ def run_30km_bridge(num_runs=20):
                     q_alice_final = alice.qmemory.peek(0)[0]
                     if q_alice_final:
                         f = ns.qubits.fidelity([q_alice_final, q_david_final], ks.b00)
+                        fidelities[-1] = f
                         total_successful_bridging += 1
-                        print(f"Run {i}: Corrected Fidelity: {f:.4f}")
 
+        # 11. Release: empty every memory (end pair and unswapped qubits)
+        release(alice, bob, charlie, david)
+        log.trial(i, fidelity=fidelities[-1])
+
+    log.close()
     print(f"\nTotal Successes: {total_successful_bridging} / {num_runs}")
+    return fidelities
 
 if __name__ == "__main__":
-    run_30km_bridge()
\ No newline at end of file
+    from dispatcher import run_bridge_script
+    # Lossy, so no fast engine is exact: the dispatcher falls back to run_30km_bridge
+    run_bridge_script(run_30km_bridge, depolar_rate=0.01, p_loss_init=0.1, p_loss_length=0.25)
\ No newline at end of file
@@ -1,8 +1,18 @@
 import netsquid as ns
 import netsquid.qubits.ketstates as ks
 
-def run_30km_bridge(num_runs=20):
+from resource_states import create_noisy
+from trial_logging import TrialLog
+
+def run_30km_bridge(num_runs=20, log=None):
+    """
+    Returns the Alice-David fidelity of every run.
+    Per-run records go to `log` (a trial_logging.TrialLog; default: progress line only).
+    """
+    log = log or TrialLog("4NodesNoiseModela", total=num_runs)
     total_successful_bridging = 0
+    fidelity_sum = 0.0
+    fidelities = []
     
     # HARDWARE REALITY: 1% error per qubit to represent 99% fidelity
     # This ensures the results are realistic for your Q-DAY submission.
@@ -13,21 +23,12 @@ def run_30km_bridge(num_runs=20):
     for i in range(num_runs):
         ns.sim_reset()
         
-        # 1. Create 6 qubits (2 per 10km segment)
-        q1_a, q1_b = ns.qubits.create_qubits(2) # Segment 1 (Alice-Bob)
-        q2_b, q2_c = ns.qubits.create_qubits(2) # Segment 2 (Bob-Charlie)
-        q3_c, q3_d = ns.qubits.create_qubits(2) # Segment 3 (Charlie-David)
-        
-        # 2. Manually entangle them into Bell Pairs (|Phi+>)
-        # This mirrors the behavior of a QSource
-        for pair in [(q1_a, q1_b), (q2_b, q2_c), (q3_c, q3_d)]:
-            ns.qubits.operate(pair[0], ns.H)
-            ns.qubits.operate(pair, ns.CNOT)
-
-        # 3. INJECT HARDWARE NOISE
-        # Applying depolarization to every qubit in the chain
-        for q in [q1_a, q1_b, q2_b, q2_c, q3_c, q3_d]:
-            ns.qubits.depolarize(q, prob=error_prob)
+        # 1-3. Three depolarized Bell Pairs (|Phi+>), one per 10km segment
+        # Same state as H + CNOT + depolarize on every qubit, assigned from the
+        # precomputed resource-state cache instead of replaying the gates
+        q1_a, q1_b = create_noisy("bell", noise="depolarize", prob=error_prob) # Segment 1 (Alice-Bob)
+        q2_b, q2_c = create_noisy("bell", noise="depolarize", prob=error_prob) # Segment 2 (Bob-Charlie)
+        q3_c, q3_d = create_noisy("bell", noise="depolarize", prob=error_prob) # Segment 3 (Charlie-David)
 
         # 4. SWAP AT BOB (Bell State Measurement)
         ns.qubits.operate([q1_b, q2_b], ns.CNOT)
@@ -53,11 +54,17 @@ def run_30km_bridge(num_runs=20):
         # We check the correlation between the very first and very last qubit
         f = ns.qubits.fidelity([q1_a, q3_d], ks.b00)
         total_successful_bridging += 1
-        print(f"Run {i}: Realistic Fidelity: {f:.4f}")
+        fidelity_sum += f
+        fidelities.append(f)
+        log.trial(i, fidelity=f)
 
+    log.close()
     print(f"\n--- 30km Bridge Results ---")
     print(f"Total Successes: {total_successful_bridging} / {num_runs}")
+    print(f"Mean Fidelity: {fidelity_sum / max(total_successful_bridging, 1):.4f}")
     print(f"Target Hardware Fidelity: {100*(1-error_prob)}%")
+    return fidelities
 
 if __name__ == "__main__":
-    run_30km_bridge()
\ No newline at end of file
+    from dispatcher import run_bridge_script
+    run_bridge_script(run_30km_bridge, depolar_rate=0.01)
\ No newline at end of file
@@ -6,6 +6,8 @@ from netsquid.qubits.state_sampler import StateSampler
 import netsquid.qubits.ketstates as ks
 from netsquid.components.models import DepolarNoiseModel, FixedDelayModel
 
+from trial_logging import TrialLog
+
 def run_single_abcd_transmission():
     """Simulates one correlated bit between Alice and David using Memory routing."""
     ns.sim_reset()
@@ -75,13 +77,13 @@ def run_single_abcd_transmission():
         # Success if David matches Alice's reference
         return 0 if m_alice == m_david else 1
     
-    return 1 # Error if qubit lost
+    return None # Qubit lost (heralded erasure)
 
 def majority_vote_transmission():
     results = []
     for _ in range(3):
         res = run_single_abcd_transmission()
-        results.append(res)
+        results.append(1 if res is None else res) # Loss counted as an error
     return 0 if results.count(0) > results.count(1) else 1
 
 def main():
@@ -91,9 +93,12 @@ def main():
 
     print(f"Goal 4: Executing ABCD Chain with Repetition Code (Length 3)...")
 
-    for i in range(num_runs):
-        if majority_vote_transmission() == 0:
-            successes += 1
+    with TrialLog("Goal 4", total=num_runs) as log:
+        for i in range(num_runs):
+            decoded = majority_vote_transmission()
+            if decoded == 0:
+                successes += 1
+            log.trial(i, decoded=decoded)
 
     elapsed = time.time() - start_time
     avg_success = (successes / num_runs) * 100
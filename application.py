@@ -25,7 +25,8 @@ def anonymous_transmit_bit(node, secret_bit=None, is_sender=False):
     # 3. MEASUREMENT & COLLAPSE
     # Measurement collapses the local qubit. The 'tracelessness' comes from the fact
     # that the local result 'm' looks random (50/50) to an attacker.
-    m, _ = ns.qubits.measure(qubit)
+    # discard=True frees the qubit from the shared QState once it is measured.
+    m, _ = ns.qubits.measure(qubit, discard=True)
 
     # 4. CLASSICAL POST-PROCESSING
     # The final bit is the XOR sum (parity) of all participants' measurements.
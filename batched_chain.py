@@ -0,0 +1,145 @@
+import time
+import numpy as np
+
+# ============================================================
+# REPLICATED-TOPOLOGY BATCHING: K ABCD chains per sim_run
+# run_simulation pays, per round, a sim_reset, a network build and
+# four sim_run calls with Python control flow in between. Here K
+# disjoint copies of Alice -> Bob -> Charlie -> David live in one
+# Network, built once. Bob and Charlie store and forward a qubit
+# the moment it arrives (the same zero dwell as the pop after each
+# sim_run in run_abcd_round), so triggering every source and one
+# ns.sim_run() delivers all K qubits; Alice and David then measure
+# each copy and its memories are released for the next batch.
+# Copies share no components, so their rounds are independent.
+# tune_k() measures rounds/s for K = 1, 2, 4, ... and picks the
+# fastest; simulate_abcd_batched() runs any number of rounds.
+# ============================================================
+
+K_CANDIDATES = tuple(2 ** i for i in range(11))   # 1 .. 1024
+
+
+def build_batch(k, loss_model=None, noise_model=None):
+    """Resets the simulation and builds `k` relay-on-arrival chains in one Network."""
+    import netsquid as ns
+    from netsquid.nodes import Network
+    from run_simulation import build_abcd_network
+
+    ns.sim_reset()
+    chains = [build_abcd_network(loss_model, noise_model, suffix=f"_{c}", relay_on_arrival=True) for c in range(k)]
+    network = Network(f"ABCD_x{k}")
+    network.add_nodes([node for chain in chains for node in chain[:4]])
+    return network, chains
+
+
+def run_batch(chains, secret_bit=0):
+    """
+    One round on every chain: all sources fire, one sim_run, then the measurements.
+    Returns (bits, lost): the parity David decodes per chain and whether its qubit was lost.
+    """
+    import netsquid as ns
+    from application import anonymous_transmit_bit
+    from qubit_lifecycle import release
+
+    for chain in chains:
+        chain[4].trigger()
+    ns.sim_run()
+
+    bits = np.zeros(len(chains), dtype=int)
+    lost = np.zeros(len(chains), dtype=bool)
+    for c, (alice, bob, charlie, david, _) in enumerate(chains):
+        m_alice = anonymous_transmit_bit(alice, secret_bit=secret_bit, is_sender=True)
+        if david.qmemory.peek(0)[0] is None:
+            lost[c] = True
+        else:
+            bits[c] = m_alice ^ anonymous_transmit_bit(david, is_sender=False)
+        release(alice, bob, charlie, david)
+    return bits, lost
+
+
+def _rate(chains, secret_bit, min_s):
+    """Rounds per second over batches on `chains`, for at least `min_s` seconds."""
+    rounds, start = 0, time.perf_counter()
+    while True:
+        run_batch(chains, secret_bit)
+        rounds += len(chains)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_s:
+            return rounds / elapsed
+
+
+def tune_k(candidates=K_CANDIDATES, min_s=0.3, loss_model=None, noise_model=None, secret_bit=0,
+           stop_below=0.5):
+    """
+    Rounds/s for each K in `candidates` (increasing); stops once a K runs below
+    `stop_below` times the best so far (0: try all). Returns {"best", "rows"},
+    rows (K, build s, rounds/s).
+    """
+    rows, best = [], None
+    for k in candidates:
+        start = time.perf_counter()
+        _, chains = build_batch(k, loss_model, noise_model)
+        build_s = time.perf_counter() - start
+        rate = _rate(chains, secret_bit, min_s)
+        rows.append((k, build_s, rate))
+        if best is None or rate > best[1]:
+            best = (k, rate)
+        elif rate < stop_below * best[1]:
+            break
+    return {"best": best[0], "rows": rows}
+
+
+def simulate_abcd_batched(rounds, secret_bit=0, k=None, loss_model=None, noise_model=None, seed=None):
+    """
+    `rounds` ABCD rounds in batches of `k` chains (None: tune_k first). NetSquid is
+    seeded once (replay_index.seed_netsquid) when `seed` is given; single rounds
+    cannot be replayed, since a batch shares one random stream.
+    Returns {"bits", "lost", "k", "wall_s", "rounds_per_s"}.
+    """
+    from replay_index import seed_netsquid
+
+    if k is None:
+        k = tune_k(loss_model=loss_model, noise_model=noise_model, secret_bit=secret_bit)["best"]
+    if seed is not None:
+        seed_netsquid(seed)
+    start = time.perf_counter()
+    _, chains = build_batch(min(k, rounds), loss_model, noise_model)
+    bits, lost = [], []
+    for first in range(0, rounds, k):
+        b, l = run_batch(chains[:rounds - first], secret_bit)
+        bits.append(b)
+        lost.append(l)
+    wall_s = time.perf_counter() - start
+    return {"bits": np.concatenate(bits), "lost": np.concatenate(lost), "k": k, "wall_s": wall_s,
+            "rounds_per_s": rounds / wall_s}
+
+
+if __name__ == "__main__":
+    try:
+        import netsquid  # noqa: F401
+    except ImportError:
+        print("batched_chain needs NetSquid (pip install netsquid) for its benchmark.")
+        raise SystemExit
+
+    from run_simulation import simulate_abcd_chain
+
+    start, rounds = time.perf_counter(), 0
+    while time.perf_counter() - start < 2.0:
+        simulate_abcd_chain(0)
+        rounds += 1
+    sequential = rounds / (time.perf_counter() - start)
+
+    print("=" * 60)
+    print(f"BATCHED ABCD CHAINS: K copies per sim_run "
+          f"(sequential run_simulation: {sequential:.0f} rounds/s)")
+    print("=" * 60)
+    print(f"{'K':>6s} {'build s':>8s} {'rounds/s':>10s} {'speedup':>8s}")
+    tuned = tune_k(stop_below=0)
+    for k, build_s, rate in tuned["rows"]:
+        print(f"{k:6d} {build_s:8.3f} {rate:10.0f} {rate / sequential:7.1f}x")
+    print(f"best K = {tuned['best']}")
+
+    result = simulate_abcd_batched(20000, k=tuned["best"], seed=1)
+    bits, lost = result["bits"], result["lost"]
+    print(f"20000 rounds at K={result['k']}: {result['rounds_per_s']:.0f} rounds/s, "
+          f"bit error {bits[~lost].mean():.4f}, lost {lost.mean():.4f}")
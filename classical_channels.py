@@ -0,0 +1,140 @@
+from network_config import load_config, channel_lengths, NS_PER_KM
+
+# ============================================================
+# CLASSICAL CHANNELS with fiber delay
+# Parity announcements and feed-forward outcomes travel as NetSquid
+# Messages over ClassicalChannels (5,000 ns per km), so they cost
+# simulated time. Outcomes of many rounds can be batched into one
+# Message: one classical round trip then serves the whole batch.
+# ============================================================
+
+CHAIN_KM = sum(channel_lengths(load_config()))
+
+
+def connect_classical(n1, n2, p1, p2, name, length=10):
+    """One-way ClassicalChannel n1.p1 -> n2.p2 (ports are added if missing)."""
+    from netsquid.components import ClassicalChannel
+    from netsquid.components.models import FixedDelayModel
+
+    for node, port in ((n1, p1), (n2, p2)):
+        if port not in node.ports:
+            node.add_ports([port])
+    chan = ClassicalChannel(name, length=length, models={"delay_model": FixedDelayModel(delay=length * NS_PER_KM)})
+    n1.ports[p1].connect(chan.ports["send"])
+    chan.ports["recv"].connect(n2.ports[p2])
+    return chan
+
+
+class Inbox:
+    """Collects the items of every Message arriving at a port, with arrival times."""
+
+    def __init__(self, port, on_message=None):
+        self.items, self.arrivals, self.on_message = [], [], on_message
+        port.bind_input_handler(self._receive)
+
+    def _receive(self, message):
+        import netsquid as ns
+        self.arrivals.append(ns.sim_time())
+        self.items.extend(message.items)
+        if self.on_message is not None:
+            self.on_message(message.items)
+
+
+class OutcomeBatcher:
+    """Buffers per-round outcomes and sends them as one Message every `batch_size` rounds."""
+
+    def __init__(self, port, batch_size=1):
+        self.port, self.batch_size = port, batch_size
+        self.pending, self.sent = [], 0
+
+    def add(self, *outcome):
+        """Queues one round's outcome; returns True if this filled a batch and sent it."""
+        self.pending.append(outcome)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+            return True
+        return False
+
+    def flush(self):
+        from netsquid.components.component import Message
+        if self.pending:
+            self.port.tx_output(Message(list(self.pending)))
+            self.sent += 1
+            self.pending = []
+
+
+def anonymous_bits_classical(bits, batch_size=1, loss_model=None):
+    """
+    Runs the ABCD anonymous rounds on one persistent network. Alice announces her
+    X outcome to David over a 30 km ClassicalChannel, batched `batch_size` rounds
+    per Message; David combines it with his own outcome into the parity and ACKs
+    the batch; Alice starts the next batch once the ACK is back (stop-and-wait
+    per batch). Returns (decoded bits, stats) with all latency in simulated ns.
+    """
+    import netsquid as ns
+    from netsquid.components.component import Message
+    from run_simulation import build_abcd_network, run_abcd_round
+
+    ns.sim_reset()
+    network = build_abcd_network(loss_model)
+    alice, _, _, david = network[:4]
+    connect_classical(alice, david, "c_out_D", "c_in_A", "CCh_AD", length=CHAIN_KM)
+    connect_classical(david, alice, "c_out_A", "c_in_D", "CCh_DA", length=CHAIN_KM)
+
+    david_outcomes, decoded, acks = {}, {}, []
+
+    def david_receives(items):
+        for round_id, m_alice in items:
+            m_david = david_outcomes.pop(round_id)
+            decoded[round_id] = None if m_david is None else m_alice ^ m_david
+        david.ports["c_out_A"].tx_output(Message([items[-1][0]]))
+        acks.append(None)
+
+    announcements = OutcomeBatcher(alice.ports["c_out_D"], batch_size)
+    Inbox(david.ports["c_in_A"], david_receives)
+    ack_inbox = Inbox(alice.ports["c_in_D"])
+
+    for i, bit in enumerate(bits):
+        m_alice, m_david = run_abcd_round(network, bit)
+        david_outcomes[i] = m_david
+        if announcements.add(i, m_alice) or i == len(bits) - 1:
+            announcements.flush()
+            ns.sim_run()   # announcement -> David -> ACK -> Alice
+    return [decoded[i] for i in range(len(bits))], {
+        "messages": announcements.sent + len(acks),
+        "sim_ns": ns.sim_time(),
+        "ack_times": ack_inbox.arrivals,
+    }
+
+
+def classical_cost(num_bits, batch_size=1, round_ns=CHAIN_KM * NS_PER_KM, trip_ns=CHAIN_KM * NS_PER_KM):
+    """
+    Closed-form counterpart of anonymous_bits_classical: every round costs one
+    quantum round (the qubit crossing the chain), every batch one announcement +
+    ACK round trip.
+    """
+    batches = -(-num_bits // batch_size)
+    sim_ns = num_bits * round_ns + batches * 2 * trip_ns
+    return {"messages": 2 * batches, "sim_ns": sim_ns, "ns_per_bit": sim_ns / num_bits,
+            "classical_ns_per_bit": batches * 2 * trip_ns / num_bits}
+
+
+if __name__ == "__main__":
+    num_bits = 240
+
+    print("=" * 64)
+    print(f"CLASSICAL ROUND-TRIP COST PER BIT ({CHAIN_KM:.0f} km announcement + ACK)")
+    print("=" * 64)
+    for batch_size in (1, 2, 4, 8, 16, 60, 240):
+        row = classical_cost(num_bits, batch_size)
+        print(f"batch {batch_size:3d}: {row['messages']:4d} messages, "
+              f"{row['classical_ns_per_bit'] / 1e3:7.2f} us classical/bit, "
+              f"{row['ns_per_bit'] / 1e3:7.2f} us total/bit")
+
+    try:
+        for batch_size in (1, 8, 60):
+            decoded, stats = anonymous_bits_classical([0, 1] * (num_bits // 2), batch_size)
+            print(f"NetSquid batch {batch_size:3d}: {stats['messages']} messages, "
+                  f"{stats['sim_ns'] / num_bits / 1e3:.2f} us/bit simulated")
+    except ImportError:
+        pass
@@ -0,0 +1,265 @@
+import contextlib
+import importlib
+import io
+import math
+import time
+import numpy as np
+
+from dispatcher import Job, dispatch
+from pauli_surrogate import (fibre_survival, depolarizing_channel, compose, bell_fidelity, bridge_fidelity)
+from replay_index import seed_netsquid
+
+# ============================================================
+# CROSS-VALIDATION: fast engines vs the NetSquid references
+# References: run_simulation (ABCD chain), 4NodesNoiseModel
+# (lossy bridge, channel depolarizing) and 4NodesNoiseModeDensity
+# (DM bridge). On a grid of configurations, each reference and
+# each candidate engine runs from its own derived seed; success
+# rates are compared with a two-proportion z-test, fidelity
+# distributions with a two-sample Kolmogorov-Smirnov test (or a
+# Welch test on the means where only the mean is comparable).
+# A cell passes when the test finds no difference at `alpha`, or
+# the observed difference is inside the tolerance band.
+# ============================================================
+
+ALPHA = 0.01
+TOLERANCE = {"success": 0.02, "fidelity": 0.02}
+
+
+# ------------------------------------------------------------
+# TWO-SAMPLE TESTS (p-values; a candidate may give an exact value instead of samples)
+# ------------------------------------------------------------
+def _normal_p(diff, se):
+    if se == 0:   # both sides deterministic: equal up to rounding or not
+        return 1.0 if abs(diff) < 1e-9 else 0.0
+    return math.erfc(abs(diff) / se / math.sqrt(2))
+
+
+def proportion_test(ref, cand):
+    """Two-proportion z-test on boolean samples (one-sample test if `cand` is a probability)."""
+    ref = np.asarray(ref, dtype=bool)
+    p1, n1 = ref.mean(), len(ref)
+    if np.ndim(cand) == 0:
+        p0 = float(cand)
+        return p1 - p0, _normal_p(p1 - p0, math.sqrt(p0 * (1 - p0) / n1))
+    cand = np.asarray(cand, dtype=bool)
+    p2, n2 = cand.mean(), len(cand)
+    pooled = (ref.sum() + cand.sum()) / (n1 + n2)
+    return p1 - p2, _normal_p(p1 - p2, math.sqrt(pooled * (1 - pooled) * (1 / n1 + 1 / n2)))
+
+
+def mean_test(ref, cand):
+    """Welch z-test on the means (one-sample if `cand` is an exact mean)."""
+    ref = np.asarray(ref, dtype=float)
+    var = ref.var(ddof=1) / len(ref) if len(ref) > 1 else 0.0
+    if np.ndim(cand) == 0:
+        return ref.mean() - float(cand), _normal_p(ref.mean() - float(cand), math.sqrt(var))
+    cand = np.asarray(cand, dtype=float)
+    var += cand.var(ddof=1) / len(cand) if len(cand) > 1 else 0.0
+    return ref.mean() - cand.mean(), _normal_p(ref.mean() - cand.mean(), math.sqrt(var))
+
+
+def ks_test(ref, cand):
+    """Two-sample Kolmogorov-Smirnov test (asymptotic p-value); falls back to mean_test for an exact mean."""
+    if np.ndim(cand) == 0:
+        return mean_test(ref, cand)
+    a, b = np.sort(np.asarray(ref, dtype=float)), np.sort(np.asarray(cand, dtype=float))
+    grid = np.concatenate([a, b])
+    d = np.max(np.abs(np.searchsorted(a, grid, side="right") / len(a) -
+                      np.searchsorted(b, grid, side="right") / len(b)))
+    ne = len(a) * len(b) / (len(a) + len(b))
+    lam = (math.sqrt(ne) + 0.12 + 0.11 / math.sqrt(ne)) * d
+    k = np.arange(1, 101)
+    p = float(np.clip(2 * np.sum((-1) ** (k - 1) * np.exp(-2 * k ** 2 * lam ** 2)), 0.0, 1.0)) if lam > 0 else 1.0
+    return a.mean() - b.mean(), p
+
+
+TESTS = {"proportion": proportion_test, "mean": mean_test, "ks": ks_test}
+
+
+# ------------------------------------------------------------
+# REFERENCES (NetSquid) - each returns {metric: samples}
+# ------------------------------------------------------------
+def _quiet(fn, *args, **kwargs):
+    """Runs a reference script with its per-run prints swallowed."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+def abcd_reference(config, trials, seed):
+    result = dispatch(Job(trials=trials, repetitions=1, **config), engine="netsquid", seed=seed)
+    return {"success": result["bits"].ravel() == 0}
+
+
+def lossy_bridge_reference(config, trials, seed):
+    seed_netsquid(seed)
+    fidelities = _quiet(importlib.import_module("4NodesNoiseModel").run_30km_bridge, trials, **config)
+    return {"success": np.array([f is not None for f in fidelities]),
+            "fidelity": np.array([f for f in fidelities if f is not None])}
+
+
+def density_bridge_reference(config, trials, seed):
+    import netsquid as ns
+    from netsquid.qubits.qformalism import QFormalism
+    previous = ns.get_qstate_formalism()
+    module = importlib.import_module("4NodesNoiseModeDensity")   # switches to DM on import
+    try:
+        ns.set_qstate_formalism(QFormalism.DM)
+        seed_netsquid(seed)
+        return {"fidelity": np.array(_quiet(module.run_30km_bridge, trials, **config))}
+    finally:
+        ns.set_qstate_formalism(previous)
+
+
+# ------------------------------------------------------------
+# CANDIDATES - samples ({metric: array}) or exact values ({metric: float})
+# ------------------------------------------------------------
+def abcd_closed_form(config, trials, seed):
+    result = dispatch(Job(trials=trials, repetitions=1, **config), engine="closed-form")
+    return {"success": result["accuracy"]}
+
+
+def abcd_stabilizer(config, trials, seed):
+    result = dispatch(Job(trials=trials, repetitions=1, **config), engine="stabilizer", seed=seed)
+    return {"success": result["bits"].ravel() == 0}
+
+
+def pauli_frame_bridge(num_noisy, p, trials, rng, survival=1.0, num_spans=3):
+    """
+    Pauli-frame sampling of a swap bridge: one Pauli per noisy qubit (I, X, Y, Z
+    with the depolarizing weights); the pair is |b00> iff the XOR of all frames is I.
+    """
+    arrived = np.all(rng.random((trials, num_spans)) < survival, axis=1)
+    kind = rng.choice(4, size=(trials, num_noisy), p=depolarizing_channel(p))
+    x = np.bitwise_xor.reduce((kind == 1) | (kind == 2), axis=1)
+    z = np.bitwise_xor.reduce((kind == 2) | (kind == 3), axis=1)
+    return arrived, (~x & ~z)[arrived].astype(float)
+
+
+def lossy_bridge_closed_form(config, trials, seed):
+    survival = fibre_survival(10, config["p_loss_init"], config["p_loss_length"])
+    return {"success": float(survival ** 3),
+            "fidelity": float(bell_fidelity(compose(*[depolarizing_channel(config["depolar_rate"])] * 3)))}
+
+
+def lossy_bridge_pauli_frame(config, trials, seed):
+    survival = fibre_survival(10, config["p_loss_init"], config["p_loss_length"])
+    arrived, fidelity = pauli_frame_bridge(3, config["depolar_rate"], trials, np.random.default_rng(seed), survival)
+    return {"success": arrived, "fidelity": fidelity}
+
+
+def density_bridge_closed_form(config, trials, seed):
+    return {"fidelity": float(bridge_fidelity(config["error_prob"]))}
+
+
+def density_bridge_dm(config, trials, seed):
+    result = dispatch(Job("bridge", "fidelity", depolar_rate=config["error_prob"]), engine="density-matrix")
+    return {"fidelity": result["fidelity"]}
+
+
+def density_bridge_pauli_frame(config, trials, seed):
+    _, fidelity = pauli_frame_bridge(6, config["error_prob"], trials, np.random.default_rng(seed))
+    return {"fidelity": fidelity}
+
+
+CASES = {
+    "run_simulation": {
+        "configs": [dict(depolar_rate=p, p_loss_init=li, p_loss_length=ll)
+                    for p in (0.0, 0.03, 0.1) for li, ll in ((0.0, 0.0), (0.1, 0.25))],
+        "reference": abcd_reference,
+        "candidates": {"closed-form": abcd_closed_form, "stabilizer": abcd_stabilizer},
+        "tests": {"success": "proportion"},
+    },
+    "4NodesNoiseModel": {
+        "configs": [dict(depolar_rate=p, p_loss_init=li, p_loss_length=ll)
+                    for p in (0.01, 0.05, 0.1) for li, ll in ((0.1, 0.25), (0.02, 0.02))],
+        "reference": lossy_bridge_reference,
+        "candidates": {"closed-form": lossy_bridge_closed_form, "pauli-frame": lossy_bridge_pauli_frame},
+        "tests": {"success": "proportion", "fidelity": "ks"},
+    },
+    "4NodesNoiseModeDensity": {
+        # DM runs give the ensemble fidelity every time: only the mean is comparable with samples
+        "configs": [dict(error_prob=p) for p in (0.0, 0.02, 0.05, 0.1)],
+        "reference": density_bridge_reference,
+        "candidates": {"closed-form": density_bridge_closed_form, "density-matrix": density_bridge_dm,
+                       "pauli-frame": density_bridge_pauli_frame},
+        "tests": {"fidelity": "mean"},
+    },
+}
+
+
+def _seed(base, *path):
+    return int(np.random.SeedSequence([base, *path]).generate_state(1)[0])
+
+
+def compare(ref, cand, tests, alpha=ALPHA, tolerance=TOLERANCE):
+    """Per-metric (difference, p-value, passed) for one reference / candidate pair."""
+    rows = {}
+    for metric, test in tests.items():
+        if metric not in ref or metric not in cand or len(ref[metric]) == 0:
+            continue
+        diff, p = TESTS[test](ref[metric], cand[metric])
+        rows[metric] = (float(diff), p, p >= alpha or abs(diff) <= tolerance[metric])
+    return rows
+
+
+def cross_validate(cases=CASES, trials=2000, seed=0, reference=None, alpha=ALPHA, tolerance=TOLERANCE):
+    """
+    Runs every case on its configuration grid. `reference` optionally names a
+    candidate to stand in for NetSquid. Returns rows of
+    (case, config, candidate, {metric: (diff, p, passed)}, speedup).
+    """
+    rows = []
+    for c, (name, case) in enumerate(cases.items()):
+        ref_fn = case["candidates"][reference] if reference else case["reference"]
+        for i, config in enumerate(case["configs"]):
+            start = time.perf_counter()
+            ref = ref_fn(config, trials, _seed(seed, c, i, 0))
+            ref_s = time.perf_counter() - start
+            for j, (cand_name, cand_fn) in enumerate(case["candidates"].items(), start=1):
+                if cand_name == reference:
+                    continue
+                start = time.perf_counter()
+                cand = cand_fn(config, trials, _seed(seed, c, i, j))
+                cand_s = time.perf_counter() - start
+                rows.append((name, config, cand_name, compare(ref, cand, case["tests"], alpha, tolerance),
+                             ref_s / max(cand_s, 1e-9)))
+    return rows
+
+
+def print_matrix(rows):
+    print(f"{'case':>22s} {'config':>50s} {'candidate':>15s} {'metric':>9s} {'diff':>8s} "
+          f"{'p':>6s} {'result':>7s} {'speedup':>9s}")
+    for case, config, cand, metrics, speedup in rows:
+        label = ", ".join(f"{k}={v:g}" for k, v in config.items())
+        for metric, (diff, p, passed) in metrics.items():
+            print(f"{case:>22s} {label:>50s} {cand:>15s} {metric:>9s} {diff:8.4f} {p:6.3f} "
+                  f"{'PASS' if passed else 'FAIL':>7s} {speedup:8.1f}x")
+    failed = sum(not passed for *_, metrics, _ in rows for _, _, passed in metrics.values())
+    cells = sum(len(metrics) for *_, metrics, _ in rows)
+    print(f"{cells - failed} / {cells} cells pass")
+
+
+if __name__ == "__main__":
+    try:
+        import netsquid  # noqa: F401
+        print("=" * 134)
+        print("CROSS-VALIDATION against the NetSquid references")
+        print("=" * 134)
+        print_matrix(cross_validate(trials=2000))
+    except ImportError:
+        # Without NetSquid: the sampling engines stand in for the reference, which
+        # still checks the exact engines and the tests (including a wrong candidate)
+        broken = dict(CASES["4NodesNoiseModel"])
+        broken["candidates"] = dict(broken["candidates"], **{
+            "2-span (wrong)": lambda config, trials, seed: {
+                "fidelity": float(bell_fidelity(compose(*[depolarizing_channel(config["depolar_rate"])] * 2)))}})
+        cases = {"run_simulation": CASES["run_simulation"], "4NodesNoiseModel": broken,
+                 "4NodesNoiseModeDensity": CASES["4NodesNoiseModeDensity"]}
+        print("=" * 134)
+        print("CROSS-VALIDATION (NetSquid not installed: sampling engines stand in for the reference)")
+        print("=" * 134)
+        for name, case in cases.items():
+            stand_in = "stabilizer" if "stabilizer" in case["candidates"] else "pauli-frame"
+            trials = 4000 if stand_in == "stabilizer" else 20000
+            print_matrix(cross_validate({name: case}, trials=trials, reference=stand_in))
@@ -0,0 +1,185 @@
+import numpy as np
+
+from stabilizer import ghz_tableau
+from topology import adjacency, build_topology, sequential_ghz
+from parity_aggregation import tree_reduce
+
+# ============================================================
+# CHRISTANDL-WEHNER PROTOCOL SUITE on the GHZ parity primitive
+#   1. collision detection - is there exactly one sender?
+#   2. notification        - the sender tells the receiver, anonymously
+#   3. transmission        - one GHZ parity round per message bit
+# Every stage is a sequence of GHZ rounds: each party applies Z
+# if its input bit is 1, all measure X, the XOR of outcomes is the
+# XOR of inputs (application.anonymous_transmit_bit at every node).
+# With memory for M states per node, M GHZ states are distributed
+# in one phase; collision-detection and notification rounds are
+# pipelined into shared phases, transmission waits for the result.
+# ============================================================
+
+SLOT_NS = 10000   # source repetition time between consecutive GHZ states
+
+
+def parity_round(inputs, error_prob=0.0, rng=None):
+    """One GHZ round on the stabilizer tableau; returns the parity of the X outcomes."""
+    rng = rng or np.random.default_rng()
+    n = len(inputs)
+    tab = ghz_tableau(n)
+    flips = np.flatnonzero(inputs)
+    if len(flips):
+        tab.pauli(np.zeros(tab.words, dtype=np.uint64), tab.mask(flips))
+    if error_prob:
+        tab.depolarize(error_prob, rng)
+    tab.h_all(tab.mask(range(n)))
+    parity = 0
+    for q in range(n):
+        parity ^= tab.measure_z(q, rng)
+    return parity
+
+
+class RoundEngine:
+    """
+    Runs parity rounds and accounts for them: GHZ states are distributed in
+    phases of up to `memory_positions` states; a phase costs the GHZ distribution
+    latency, one source slot per extra state and one batched parity aggregation.
+    barrier() closes a partly used phase (a stage waiting on earlier results).
+    """
+
+    def __init__(self, n, memory_positions=1, error_prob=0.0, rng=None, topology="chain"):
+        self.n, self.capacity, self.error_prob = n, memory_positions, error_prob
+        self.rng = rng or np.random.default_rng()
+        graph_config = build_topology(topology, n)
+        self.ghz_ns = sequential_ghz(graph_config)["quantum_ns"]
+        known, _ = tree_reduce(adjacency(graph_config), {f"N{i}": 0 for i in range(n)})
+        self.aggregate_ns = max(time for time, _ in known.values())
+        self.ghz_states, self.phases, self.sim_ns, self.in_phase = 0, 0, 0.0, 0
+
+    def round(self, inputs):
+        if self.in_phase == self.capacity:
+            self.barrier()
+        self.in_phase += 1
+        self.ghz_states += 1
+        return parity_round(inputs, self.error_prob, self.rng)
+
+    def barrier(self):
+        if self.in_phase:
+            self.phases += 1
+            self.sim_ns += self.ghz_ns + (self.in_phase - 1) * SLOT_NS + self.aggregate_ns
+            self.in_phase = 0
+
+
+def _inputs(n, bits):
+    """Input vector with the given {party: bit} set, zeros elsewhere."""
+    x = np.zeros(n, dtype=np.uint8)
+    for party, bit in bits.items():
+        x[party] = bit
+    return x
+
+
+def _logical_or(engine, voters, security):
+    """
+    Anyone in `voters` says yes: they input random bits; detected w.p. 1 - 2^-S.
+    All S rounds always run, so the round count reveals nothing.
+    """
+    results = [engine.round(_inputs(engine.n, {v: engine.rng.integers(2) for v in voters}))
+               for _ in range(security)]
+    return any(results)
+
+
+def collision_detection(engine, senders, security=8):
+    """
+    Every would-be sender XORs a random nonzero S-bit tag into S rounds. A sender who
+    does not get its own tag back saw another sender and vetoes in a logical OR.
+    Returns "none", "single" or "collision".
+    """
+    tags = {}
+    for s in senders:
+        tag = np.zeros(security, dtype=np.uint8)
+        while not tag.any():
+            tag = engine.rng.integers(0, 2, security).astype(np.uint8)
+        tags[s] = tag
+    result = np.array([engine.round(_inputs(engine.n, {s: tags[s][k] for s in senders}))
+                       for k in range(security)], dtype=np.uint8)
+    vetoes = [s for s in senders if not np.array_equal(result, tags[s])]
+    if _logical_or(engine, vetoes, security):
+        return "collision"
+    return "single" if result.any() else "none"
+
+
+def notification(engine, sender, receiver, security=8):
+    """
+    For each party i, S rounds whose parity only i learns (outcomes are sent to i
+    privately); the sender inputs random bits in i = receiver's rounds. With
+    sender None the rounds still run with all-zero inputs.
+    Returns the parties that consider themselves notified.
+    """
+    notified = []
+    for i in range(engine.n):
+        voters = [sender] if sender is not None and i == receiver else []
+        if _logical_or(engine, voters, security):
+            notified.append(i)
+    return notified
+
+
+def transmission(engine, sender, bits):
+    return [engine.round(_inputs(engine.n, {sender: int(b)})) for b in bits]
+
+
+def run_session(n, messages, security=8, memory_positions=1, pipeline=True, error_prob=0.0, seed=0,
+                max_attempts=20):
+    """
+    Delivers {sender: (receiver, bits)} one message at a time. Senders who collide
+    back off with probability 1/2 and retry. With `pipeline`, collision detection and
+    notification share GHZ phases (notification runs before the collision result is
+    known and is wasted on a collision); otherwise notification waits for it.
+    Transmission always waits for the collision result.
+    Returns (delivered {sender: (receiver, notified, decoded bits)}, engine).
+    """
+    rng = np.random.default_rng(seed)
+    engine = RoundEngine(n, memory_positions, error_prob, rng)
+    pending, delivered = dict(messages), {}
+    for _ in range(max_attempts):
+        if not pending:
+            break
+        active = [s for s in pending if rng.random() < 0.5] if len(pending) > 1 else list(pending)
+        status = collision_detection(engine, active, security)
+        if not pipeline:
+            engine.barrier()
+            if status != "single":
+                continue
+
+        sender = active[0] if len(active) == 1 else None
+        receiver, bits = pending[sender] if sender is not None else (None, [])
+        notified = notification(engine, sender, receiver, security)
+        engine.barrier()
+        if status != "single":
+            continue
+        decoded = transmission(engine, sender, bits)
+        engine.barrier()
+        delivered[sender] = (receiver, notified, decoded)
+        del pending[sender]
+    return delivered, engine
+
+
+if __name__ == "__main__":
+    n, security, length = 4, 8, 64
+    rng = np.random.default_rng(1)
+    message = rng.integers(0, 2, length)
+
+    print("=" * 76)
+    print(f"CHRISTANDL-WEHNER SUITE: n={n} chain, S={security}, {length}-bit messages")
+    print("=" * 76)
+    print(f"{'senders':>8s} {'memory':>7s} {'pipeline':>9s} {'GHZ/bit':>8s} {'phases':>7s} "
+          f"{'us/bit':>9s} {'bit errors':>11s}   (mean of 30 sessions)")
+    for senders in ({0: (3, message)}, {0: (3, message), 2: (1, message[::-1])}):
+        for memory in (1, 4, 16, 64):
+            for pipeline in (False, True):
+                ghz, phases, sim_ns, bits, errors = 0, 0, 0.0, 0, 0
+                for seed in range(30):
+                    delivered, engine = run_session(n, senders, security, memory, pipeline, seed=seed)
+                    assert all(notified == [receiver] for receiver, notified, _ in delivered.values())
+                    ghz, phases, sim_ns = ghz + engine.ghz_states, phases + engine.phases, sim_ns + engine.sim_ns
+                    bits += sum(len(b) for _, _, b in delivered.values())
+                    errors += sum(int(np.sum(np.array(b) != senders[s][1])) for s, (_, _, b) in delivered.items())
+                print(f"{len(senders):8d} {memory:7d} {str(pipeline):>9s} {ghz / bits:8.2f} {phases / 30:7.1f} "
+                      f"{sim_ns / bits / 1e3:9.1f} {errors:11d}")
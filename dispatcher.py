@@ -0,0 +1,438 @@
+import contextlib
+import functools
+import io
+import logging
+import time
+import numpy as np
+
+from pauli_surrogate import (depolar_prob, fibre_survival, depolarizing_channel, dephasing_channel, compose,
+                             bell_fidelity, parity_error, repetition_error)
+from replay_index import seed_netsquid, trial_seeds
+
+# ============================================================
+# ENGINE DISPATCHER: cheapest exact backend per job
+# A Job describes what is simulated (the ABCD anonymous chain or
+# the 3-segment swap bridge), its gates, its noise, whether it
+# needs event timing or per-trial samples, and the trial count.
+# Every engine says whether it is exact for the job (and if not,
+# why) and what it would cost; dispatch() runs the cheapest exact
+# one and logs the choice. NetSquid is exact for everything.
+# Sampling engines reseed before every trial from a per-trial seed
+# (replay_index.trial_seeds), so any single trial can be re-run.
+#   closed-form   - Pauli-channel algebra, expectations only
+#   density-matrix- batched DMs, also T1/T2 (non-Pauli) memory noise
+#   stabilizer    - Clifford + Pauli noise, per-trial samples
+#   netsquid      - the event simulation itself
+# ============================================================
+
+logger = logging.getLogger(__name__)
+
+CLIFFORD_GATES = frozenset({"H", "S", "CNOT", "CZ", "X", "Y", "Z", "measure_x", "measure_z"})
+SCENARIO_GATES = {
+    "abcd": frozenset({"H", "CNOT", "Z", "measure_x"}),
+    "bridge": frozenset({"H", "CNOT", "X", "Z", "measure_z"}),
+}
+
+
+class Job:
+    """
+    One evaluation request.
+      scenario        - "abcd" (anonymous bit, qubit relayed over `num_hops`
+                        memories) or "bridge" (Bell pairs swapped at the relays)
+      metric          - "accuracy" (repetition-coded bit) or "fidelity"
+      depolar_rate    - DepolarNoiseModel rate: a probability per hop / qubit if
+                        `time_independent`, else Hz over `dwell_ns` (None = unknown)
+      dephase_prob    - extra ns.qubits.dephase per hop / qubit
+      T1, T2          - memory coherence over `dwell_ns` (amplitude damping)
+      samples         - per-trial outcomes are needed, not just the expectation
+      timing          - event-level timing (arrival times, latencies) is needed
+      extra_gates     - gates a variant of the scenario adds
+      runner          - callable(job, seeds, trace) -> result dict running that variant
+                        in NetSquid, one trial per seed; the built-in runners only
+                        wire the scenario as is
+    """
+
+    def __init__(self, scenario="abcd", metric="accuracy", trials=100, num_hops=3, length=10,
+                 depolar_rate=0.0, time_independent=True, dwell_ns=0.0, dephase_prob=0.0, T1=0.0, T2=0.0,
+                 p_loss_init=0.0, p_loss_length=0.0, repetitions=3, samples=False, timing=False,
+                 extra_gates=(), secret_bit=0, runner=None):
+        if scenario not in SCENARIO_GATES:
+            raise ValueError(f"Unknown scenario '{scenario}', expected one of {list(SCENARIO_GATES)}")
+        self.scenario, self.metric, self.trials = scenario, metric, trials
+        self.num_hops, self.length, self.repetitions = num_hops, length, repetitions
+        self.depolar_rate, self.time_independent, self.dwell_ns = depolar_rate, time_independent, dwell_ns
+        self.dephase_prob, self.T1, self.T2 = dephase_prob, T1, T2
+        self.p_loss_init, self.p_loss_length = p_loss_init, p_loss_length
+        self.samples, self.timing, self.secret_bit = samples, timing, secret_bit
+        self.gates = SCENARIO_GATES[scenario] | frozenset(extra_gates)
+        self.runner = runner
+
+    def params(self):
+        """Constructor arguments (JSON-serializable), to hash or rebuild the job."""
+        runner = None if self.runner is None else f"{self.runner.__module__}.{self.runner.__qualname__}"
+        return {"scenario": self.scenario, "metric": self.metric, "trials": self.trials,
+                "num_hops": self.num_hops, "length": self.length, "depolar_rate": self.depolar_rate,
+                "time_independent": self.time_independent, "dwell_ns": self.dwell_ns,
+                "dephase_prob": self.dephase_prob, "T1": self.T1, "T2": self.T2,
+                "p_loss_init": self.p_loss_init, "p_loss_length": self.p_loss_length,
+                "repetitions": self.repetitions, "samples": self.samples, "timing": self.timing,
+                "extra_gates": sorted(self.gates - SCENARIO_GATES[self.scenario]),
+                "secret_bit": self.secret_bit, "runner": runner}
+
+    # ---------------- properties the engines look at ----------------
+    @property
+    def custom_gates(self):
+        return not self.gates <= SCENARIO_GATES[self.scenario]
+
+    @property
+    def clifford(self):
+        return self.gates <= CLIFFORD_GATES
+
+    @property
+    def pauli_noise(self):
+        return self.T1 == 0 and self.T2 == 0
+
+    @property
+    def dwell_known(self):
+        return self.time_independent or self.dwell_ns is not None
+
+    @property
+    def lossy(self):
+        return self.p_loss_init > 0 or self.p_loss_length > 0
+
+    def noise_channel(self):
+        """Pauli channel of one hop (abcd) or one qubit (bridge)."""
+        p = depolar_prob(self.depolar_rate, self.dwell_ns or 0.0, self.time_independent)
+        return compose(depolarizing_channel(p), dephasing_channel(self.dephase_prob))
+
+    def arrival_prob(self):
+        return float(fibre_survival(self.length, self.p_loss_init, self.p_loss_length) ** self.num_hops)
+
+
+def _majority(bits):
+    """Majority vote over the last axis (ties go to 0, as application.majority_vote)."""
+    return (2 * np.sum(bits, axis=-1) > bits.shape[-1]).astype(int)
+
+
+def _sampled(bits, lost, secret_bit):
+    """
+    Result of a sampling engine. As in the closed form, bit_error is conditioned on
+    arrival; the vote counts a lost round as a wrong bit (baseline scheme), so lost
+    rounds are filled with 1 - secret_bit.
+    """
+    bits = np.where(lost, 1 - secret_bit, bits)
+    decoded = _majority(bits)
+    arrived = bits[~lost]
+    return {"accuracy": float(np.mean(decoded == secret_bit)),
+            "bit_error": float(np.mean(arrived != secret_bit)) if arrived.size else float("nan"),
+            "bits": bits, "lost": lost, "decoded": decoded}
+
+
+class ClosedFormEngine:
+    name = "closed-form"
+
+    def exact(self, job):
+        if job.samples or job.timing:
+            return "gives expectations only (no samples, no event timing)"
+        if not (job.clifford and job.pauli_noise):
+            return "needs Clifford gates and Pauli noise"
+        if job.custom_gates:
+            return "fixed circuit, no extra gates"
+        if not job.dwell_known:
+            return "time-dependent noise without dwell_ns"
+        if job.scenario == "bridge" and job.lossy:
+            return "bridge fidelity is conditioned on arrival"
+        return None
+
+    def cost_us(self, job):
+        return 50.0
+
+    def run(self, job, seeds, trace=False):
+        if job.scenario == "abcd":
+            channel = compose(*[job.noise_channel()] * job.num_hops)
+            error = float(parity_error(channel))
+            logical = float(repetition_error(error, job.repetitions, erasure=1 - job.arrival_prob()))
+            return {"accuracy": 1 - logical, "bit_error": error, "fidelity": float(bell_fidelity(channel))}
+        # Bridge: 2 noisy qubits per segment, perfect swaps push every Pauli onto one half
+        channel = compose(*[job.noise_channel()] * (2 * job.num_hops))
+        return {"fidelity": float(bell_fidelity(channel)), "bit_error": float(parity_error(channel))}
+
+
+class DensityMatrixEngine:
+    name = "density-matrix"
+
+    def exact(self, job):
+        if job.scenario != "bridge" or job.metric != "fidelity":
+            return "only the bridge fidelity"
+        if job.custom_gates:
+            return "fixed circuit, no extra gates"
+        if job.samples or job.timing:
+            return "gives expectations only (no samples, no event timing)"
+        if not job.dwell_known:
+            return "time-dependent noise without dwell_ns"
+        if job.lossy:
+            return "bridge fidelity is conditioned on arrival"
+        if job.dephase_prob:
+            return "no dephasing input"
+        return None
+
+    def cost_us(self, job):
+        return 2000.0
+
+    def run(self, job, seeds, trace=False):
+        from dm_engine import bridge_fidelity_grid
+        p = depolar_prob(job.depolar_rate, job.dwell_ns or 0.0, job.time_independent)
+        fidelity = bridge_fidelity_grid(p, job.dwell_ns or 0.0, job.T1, job.T2, job.num_hops)
+        return {"fidelity": float(fidelity[()])}
+
+
+class StabilizerEngine:
+    name = "stabilizer"
+
+    def exact(self, job):
+        if job.timing:
+            return "no event timing"
+        if not (job.clifford and job.pauli_noise):
+            return "needs Clifford gates and Pauli noise"
+        if job.custom_gates:
+            return "fixed circuit, no extra gates"
+        if not job.dwell_known:
+            return "time-dependent noise without dwell_ns"
+        if job.scenario != "abcd":
+            return "samples the ABCD parity only"
+        return None
+
+    def cost_us(self, job):
+        return 300.0 * job.trials * job.repetitions
+
+    def run(self, job, seeds, trace=False):
+        from stabilizer import Tableau
+        # Per-hop Pauli channel, sampled as one Pauli on the travelling qubit
+        probs = compose(*[job.noise_channel()] * job.num_hops)
+        arrival = job.arrival_prob()
+        bits = np.zeros((len(seeds), job.repetitions), dtype=int)
+        lost = np.zeros(bits.shape, dtype=bool)
+        for i, seed in enumerate(seeds):
+            rng = np.random.default_rng(seed)
+            lost[i] = rng.random(job.repetitions) >= arrival
+            for k in range(job.repetitions):
+                if lost[i, k]:
+                    if trace:
+                        logger.debug("seed %d round %d: qubit lost", seed, k)
+                    continue
+                tab = Tableau(2)
+                tab.h(0)
+                tab.cnot(0, 1)
+                if job.secret_bit:
+                    tab.z_gate(0)
+                kind = rng.choice(4, p=probs)
+                if kind in (1, 2):
+                    tab.x_gate(1)
+                if kind in (2, 3):
+                    tab.z_gate(1)
+                m_alice, m_david = tab.measure_x(0, rng), tab.measure_x(1, rng)
+                bits[i, k] = m_alice ^ m_david
+                if trace:
+                    logger.debug("seed %d round %d: hop noise %s, m_alice %d, m_david %d -> bit %d",
+                                 seed, k, "IXYZ"[kind], m_alice, m_david, bits[i, k])
+        return _sampled(bits, lost, job.secret_bit)
+
+
+class NetSquidEngine:
+    name = "netsquid"
+
+    def exact(self, job):
+        if job.runner is not None:
+            return None
+        if job.custom_gates:
+            return "extra gates need a job.runner"
+        if job.dephase_prob or not job.pauli_noise:
+            return "the built-in runners wire DepolarNoiseModel and FibreLossModel only"
+        if job.scenario == "bridge" and (job.lossy or not job.time_independent):
+            return "the built-in bridge runner takes a per-qubit depolarizing probability only"
+        return None
+
+    def cost_us(self, job):
+        return 5000.0 * job.trials * (job.repetitions if job.scenario == "abcd" else 1)
+
+    def run(self, job, seeds, trace=False):
+        if job.runner is not None:
+            return job.runner(job, seeds, trace)
+        if job.scenario == "bridge":
+            from pauli_surrogate import netsquid_bridge_fidelity
+            p = depolar_prob(job.depolar_rate, job.dwell_ns or 0.0, job.time_independent)
+            fidelities = np.zeros(len(seeds))
+            for i, seed in enumerate(seeds):
+                seed_netsquid(seed)
+                fidelities[i] = netsquid_bridge_fidelity(float(p), 1)
+                if trace:
+                    logger.debug("seed %d: fidelity %.6f", seed, fidelities[i])
+            return {"fidelity": float(fidelities.mean()), "fidelities": fidelities}
+
+        import netsquid as ns
+        from netsquid.components.models import DepolarNoiseModel
+        from netsquid.components.models.qerrormodels import FibreLossModel
+        from run_simulation import simulate_abcd_chain
+        loss_model = FibreLossModel(p_loss_init=job.p_loss_init, p_loss_length=job.p_loss_length) \
+            if job.lossy else None
+        noise_model = DepolarNoiseModel(depolar_rate=job.depolar_rate, time_independent=job.time_independent)
+        bits = np.zeros((len(seeds), job.repetitions), dtype=int)
+        lost = np.zeros(bits.shape, dtype=bool)
+        for i, seed in enumerate(seeds):
+            seed_netsquid(seed)
+            for k in range(job.repetitions):
+                outcome = simulate_abcd_chain(job.secret_bit, loss_model, noise_model)
+                lost[i, k] = outcome is None
+                bits[i, k] = outcome or 0
+                if trace:
+                    logger.debug("seed %d round %d: %s at %.0f ns", seed, k,
+                                 "qubit lost" if outcome is None else f"bit {outcome}", ns.sim_time())
+        return _sampled(bits, lost, job.secret_bit)
+
+
+ENGINES = [ClosedFormEngine(), DensityMatrixEngine(), StabilizerEngine(), NetSquidEngine()]
+
+
+def choose(job, engines=ENGINES):
+    """Returns (engine, reason, {rejected engine: why})."""
+    rejected, exact = {}, []
+    for engine in engines:
+        why = engine.exact(job)
+        if why is None:
+            exact.append(engine)
+        else:
+            rejected[engine.name] = why
+    if not exact:
+        raise ValueError("no engine can run this job: " + "; ".join(f"{n}: {w}" for n, w in rejected.items()))
+    engine = min(exact, key=lambda e: e.cost_us(job))
+    reason = f"cheapest exact engine (~{engine.cost_us(job) / 1e3:.1f} ms estimated)"
+    if len(exact) == 1 and engine.name == "netsquid":
+        reason = "no other engine is exact: " + "; ".join(f"{n}: {w}" for n, w in rejected.items())
+    return engine, reason, rejected
+
+
+def dispatch(job, engine=None, seed=None, seeds=None, trace=False):
+    """
+    Runs `job` on the cheapest exact engine (or the named one) and logs the choice.
+    Trial i runs from trial_seeds(seed, i) (a fresh base seed if None), or from
+    `seeds[i]` when given (a replay). `trace` logs every round at DEBUG level, and
+    NetSquid's own log too. Returns the engine's result dict plus "engine",
+    "reason", "rejected", "seed", "seeds", "wall_s".
+    """
+    if seeds is None:
+        seed = int(np.random.SeedSequence(seed).generate_state(1)[0]) if seed is None else seed
+        seeds = trial_seeds(seed, job.trials)
+    seeds = np.asarray(seeds, dtype=np.int64)
+    if engine is None:
+        chosen, reason, rejected = choose(job)
+    else:
+        chosen = next(e for e in ENGINES if e.name == engine)
+        why = chosen.exact(job)
+        if why is not None:
+            raise ValueError(f"engine '{engine}' is not exact for this job: {why}")
+        reason, rejected = "requested", {}
+    logger.info("%s job (%d trials) -> %s: %s", job.scenario, len(seeds), chosen.name, reason)
+    for name, why in rejected.items():
+        logger.debug("  skipped %s: %s", name, why)
+
+    ns_logger, ns_level = logging.getLogger("netsquid"), None
+    if trace and chosen.name == "netsquid":
+        ns_level = ns_logger.level
+        ns_logger.setLevel(logging.DEBUG)
+    start = time.perf_counter()
+    try:
+        result = chosen.run(job, seeds, trace)
+    finally:
+        if ns_level is not None:
+            ns_logger.setLevel(ns_level)
+    result.update(engine=chosen.name, reason=reason, rejected=rejected, seed=seed, seeds=seeds,
+                  wall_s=time.perf_counter() - start)
+    return result
+
+
+
+def script_runner(run):
+    """
+    Job.runner for a bridge script's run_30km_bridge(num_runs) (per-run fidelities,
+    None where a qubit was lost): one run per seed, NetSquid reseeded before each,
+    the script's prints swallowed. Named after `run`, so replay indexes tell scripts apart.
+    """
+    @functools.wraps(run)
+    def runner(job, seeds, trace=False):
+        fidelities = np.full(len(seeds), np.nan)
+        for i, seed in enumerate(seeds):
+            seed_netsquid(seed)
+            with contextlib.redirect_stdout(io.StringIO()):
+                f = run(1)[0]
+            fidelities[i] = np.nan if f is None else f
+            if trace:
+                logger.debug("seed %d: %s", seed, "qubit lost" if f is None else f"fidelity {f:.6f}")
+        arrived = ~np.isnan(fidelities)
+        return {"fidelity": float(fidelities[arrived].mean()) if arrived.any() else float("nan"),
+                "fidelities": fidelities, "arrival": float(arrived.mean())}
+    return runner
+
+
+def run_bridge_script(run, num_runs=20, **job_kwargs):
+    """
+    Entry point of a bridge script: a bridge fidelity Job with the script's noise
+    (`job_kwargs`) and `run` as its NetSquid runner goes to the cheapest exact engine,
+    which is logged. Lossy, timed or otherwise custom scripts still end up in `run`.
+    """
+    job = Job("bridge", "fidelity", trials=num_runs, runner=script_runner(run), **job_kwargs)
+    result = dispatch(job)
+    print(f"Engine:        {result['engine']} ({result['reason']})")
+    if "arrival" in result:
+        print(f"Arrived:       {result['arrival'] * num_runs:.0f} / {num_runs}")
+    print(f"Mean Fidelity: {result['fidelity']:.4f}")
+    return result
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    jobs = [
+        ("ABCD accuracy, 3%/hop + loss", Job(depolar_rate=0.03, p_loss_init=0.02, p_loss_length=0.02, trials=1000)),
+        ("ABCD per-trial bits", Job(depolar_rate=0.03, trials=1000, samples=True)),
+        ("ABCD, DepolarNoiseModel(0.03 Hz)", Job(depolar_rate=0.03, time_independent=False, dwell_ns=None)),
+        ("ABCD with feed-forward latency", Job(depolar_rate=0.03, timing=True)),
+        ("bridge fidelity, p=0.02", Job("bridge", "fidelity", depolar_rate=0.02)),
+        ("bridge, T1=T2=0.5 s, 10 ms dwell", Job("bridge", "fidelity", depolar_rate=0.02, dwell_ns=1e7,
+                                                  T1=5e8, T2=5e8)),
+        ("ABCD with a T gate at David", Job(depolar_rate=0.03, extra_gates={"T"})),
+    ]
+
+    print("=" * 78)
+    print("ENGINE DISPATCHER")
+    print("=" * 78)
+    for label, job in jobs:
+        try:
+            engine, reason, _ = choose(job)
+        except ValueError as err:
+            print(f"{label:34s} -> {'none':14s} (netsquid: {str(err).split('netsquid: ')[1]})")
+            continue
+        line = f"{label:34s} -> {engine.name:14s}"
+        if engine.name == "netsquid":
+            line += f" ({reason.split(': ', 1)[1].split(';')[0]}, ...)"
+        else:
+            result = dispatch(job, seed=1)
+            line += f" {job.metric} {result[job.metric]:.4f} in {result['wall_s'] * 1e3:7.2f} ms"
+        print(line)
+
+    # Same job on every exact engine: the answers agree, the cost does not
+    job = Job(depolar_rate=0.05, p_loss_init=0.02, p_loss_length=0.02, trials=20000)
+    exact = dispatch(job, engine="closed-form")
+    sampled = dispatch(job, engine="stabilizer", seed=2)
+    print(f"accuracy, 5%/hop + loss: closed-form {exact['accuracy']:.4f} ({exact['wall_s'] * 1e3:.2f} ms), "
+          f"stabilizer {sampled['accuracy']:.4f} +- {np.sqrt(sampled['accuracy'] * (1 - sampled['accuracy']) / job.trials):.4f} "
+          f"({sampled['wall_s']:.2f} s)")
+    for secret_bit in (0, 1):   # a lost round is a wrong vote for either secret bit
+        job = Job(p_loss_init=0.3, trials=20000, secret_bit=secret_bit)
+        exact = dispatch(job, engine="closed-form")["accuracy"]
+        sampled = dispatch(job, engine="stabilizer", seed=3)["accuracy"]
+        sigma = np.sqrt(exact * (1 - exact) / job.trials)
+        print(f"accuracy, 30% loss, secret bit {secret_bit}: closed-form {exact:.4f}, stabilizer {sampled:.4f} "
+              f"({'agree' if abs(sampled - exact) < 4 * sigma else 'DISAGREE'} within 4 sigma)")
+    try:
+        ns_result = dispatch(Job(trials=50), engine="netsquid")
+        print(f"NetSquid: accuracy {ns_result['accuracy']:.4f} in {ns_result['wall_s']:.2f} s")
+    except ImportError:
+        pass
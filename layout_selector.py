@@ -0,0 +1,117 @@
+import math
+import time
+import numpy as np
+from qiskit import transpile
+
+from qiskit_engine import ghz_anonymous_circuit
+from transpile_cache import get_backend, load_or_build, parity_success
+
+# ============================================================
+# ERROR-AWARE LAYOUT SELECTION for GHZ chains on large backends
+# The GHZ circuit is a CNOT chain, so any simple path of n physical
+# qubits hosts it without SWAPs. Calibration data is read once; paths
+# are scored by -log success of their 2q gates and readouts and the
+# best one is handed to transpile() as initial_layout.
+# ============================================================
+
+TWO_QUBIT_GATES = ("cz", "ecr", "cx")
+
+# Per-backend calibration summary: name -> (edge_cost, readout_cost, neighbours)
+_CALIBRATION = {}
+
+
+def _cost(error):
+    # -log(1 - e): additive along a path, so the path score is -log(success)
+    return -math.log(max(1.0 - (error or 0.0), 1e-12))
+
+
+def read_calibration(backend):
+    """Extracts 2q-gate and readout costs from backend.target once per backend."""
+    if backend.name in _CALIBRATION:
+        return _CALIBRATION[backend.name]
+    target = backend.target
+    gate = next(g for g in TWO_QUBIT_GATES if g in target.operation_names)
+
+    edge_cost, neighbours = {}, {q: set() for q in range(target.num_qubits)}
+    for (a, b), props in target[gate].items():
+        cost = _cost(props.error if props else None)
+        key = (min(a, b), max(a, b))
+        # Undirected: keep the better direction, the transpiler can flip it
+        edge_cost[key] = min(cost, edge_cost.get(key, math.inf))
+        neighbours[a].add(b)
+        neighbours[b].add(a)
+
+    readout_cost = np.zeros(target.num_qubits)
+    for (q,), props in target["measure"].items():
+        readout_cost[q] = _cost(props.error if props else None)
+
+    _CALIBRATION[backend.name] = (edge_cost, readout_cost, neighbours)
+    return _CALIBRATION[backend.name]
+
+
+def rank_chains(backend, n, readout_weight=1.0, beam_width=4096, top=10):
+    """
+    Indexes connected qubit chains of length n by combined error score.
+    Beam search over simple paths: exact while the number of partial paths stays
+    below `beam_width`, and linear in n * beam_width beyond that, so it scales to
+    large GHZ groups. Returns [(score, path), ...] best first.
+    """
+    edge_cost, readout_cost, neighbours = read_calibration(backend)
+    beam = [(readout_weight * readout_cost[q], (q,)) for q in neighbours]
+    for _ in range(n - 1):
+        extended = []
+        for score, path in beam:
+            tail = path[-1]
+            for nxt in neighbours[tail]:
+                if nxt in path:
+                    continue
+                step = edge_cost[(min(tail, nxt), max(tail, nxt))] + readout_weight * readout_cost[nxt]
+                extended.append((score + step, path + (nxt,)))
+        extended.sort(key=lambda item: item[0])
+        beam = extended[:beam_width]
+
+    # A path and its reverse are the same chain
+    ranked, seen = [], set()
+    for score, path in beam:
+        canonical = min(path, path[::-1])
+        if canonical not in seen:
+            seen.add(canonical)
+            ranked.append((score, list(path)))
+        if len(ranked) == top:
+            break
+    return ranked
+
+
+def select_layout(backend, n, **kwargs):
+    """Best physical chain for an n-party GHZ circuit (logical qubit i -> layout[i])."""
+    return rank_chains(backend, n, top=1, **kwargs)[0][1]
+
+
+if __name__ == "__main__":
+    backend = get_backend("FakeMarrakesh")
+    shots = 4000
+
+    print("=" * 60)
+    print("LAYOUT SELECTION (FakeMarrakesh, secret bit 1)")
+    print("=" * 60)
+    for n in (4, 8, 16):
+        start = time.time()
+        layout = select_layout(backend, n)
+        select_time = time.time() - start
+        qc = ghz_anonymous_circuit(1, num_parties=n)
+
+        start = time.time()
+        transpile(qc, backend, optimization_level=3, seed_transpiler=7)
+        default_time = time.time() - start
+        start = time.time()
+        transpile(qc, backend, optimization_level=3, initial_layout=layout, seed_transpiler=7)
+        chosen_time = time.time() - start
+
+        sim, variants = load_or_build(num_parties=n, seed_transpiler=7)
+        default_success = parity_success(sim, variants[1], 1, shots)
+        sim, variants = load_or_build(num_parties=n, seed_transpiler=7, initial_layout=layout)
+        chosen_success = parity_success(sim, variants[1], 1, shots)
+
+        print(f"n={n:2d} select {select_time * 1e3:6.1f} ms | transpile default {default_time:.2f} s, "
+              f"chosen {chosen_time:.2f} s | success default {default_success:.3f}, "
+              f"chosen {chosen_success:.3f}")
@@ -0,0 +1,96 @@
+import numpy as np
+
+from relay_scheduler import Flow, RelayNetwork
+
+# ============================================================
+# OPEN-LOOP LOAD GENERATOR for the relay network
+# Requests arrive on their own clock (Poisson or bursty on/off),
+# independent of when earlier ones finish, and are injected into
+# one persistent RelayNetwork built from config.yaml. Sojourn time
+# (submission -> delivery at David) is measured in simulated ns.
+# ============================================================
+
+
+def poisson_arrivals(rate_per_s, until_ns, rng):
+    """Arrival times (ns) of a Poisson process."""
+    mean_gap = 1e9 / rate_per_s
+    gaps = rng.exponential(mean_gap, int(until_ns / mean_gap * 1.2) + 16)
+    times = np.cumsum(gaps)
+    while times[-1] < until_ns:
+        times = np.concatenate([times, times[-1] + np.cumsum(rng.exponential(mean_gap, len(gaps)))])
+    return times[times < until_ns]
+
+
+def bursty_arrivals(rate_per_s, until_ns, rng, burstiness=4.0, on_ns=2e5):
+    """
+    On/off (Markov-modulated) Poisson arrivals with the same mean rate:
+    during bursts the rate is `burstiness` x the mean, otherwise zero.
+    Bursts last `on_ns` on average; silences are sized to keep the mean.
+    """
+    off_ns = on_ns * (burstiness - 1)
+    times, t = [], 0.0
+    while t < until_ns:
+        burst = rng.exponential(on_ns)
+        n = rng.poisson(rate_per_s * burstiness * burst * 1e-9)
+        times.append(t + np.sort(rng.uniform(0, burst, n)))
+        t += burst + rng.exponential(off_ns)
+    times = np.concatenate(times)
+    return times[times < until_ns]
+
+
+ARRIVALS = {"poisson": poisson_arrivals, "bursty": bursty_arrivals}
+
+
+def run_load(rate_per_s, arrivals="poisson", horizon_ns=2e8, warmup_ns=2e7, seed=0, **network_kwargs):
+    """
+    Drives one persistent network with an A -> D request stream at `rate_per_s`.
+    Returns throughput and sojourn percentiles of requests submitted after warm-up.
+    """
+    rng = np.random.default_rng(seed)
+    net = RelayNetwork(seed=seed, **network_kwargs)
+    flow = Flow("A->D", 0, len(net.names) - 1)
+    for t in ARRIVALS[arrivals](rate_per_s, horizon_ns, rng):
+        net.submit(flow, float(t))
+    net.run(until=horizon_ns)
+
+    summary, memory = net.stats(since=warmup_ns)
+    row = summary.get(flow.name, {"throughput_per_s": 0.0, "sojourn_ns": np.array([])})
+    sojourn = row["sojourn_ns"]
+    p50, p95, p99 = np.percentile(sojourn, [50, 95, 99]) if len(sojourn) else (np.inf,) * 3
+    return {
+        "offered_per_s": rate_per_s,
+        "throughput_per_s": row["throughput_per_s"],
+        "p50_ns": p50, "p95_ns": p95, "p99_ns": p99,
+        "backlog": net.backlog(),
+        "memory": memory,
+    }
+
+
+def latency_curve(rates, arrivals="poisson", **kwargs):
+    return [run_load(rate, arrivals, **kwargs) for rate in rates]
+
+
+def saturation_point(curve, efficiency=0.95):
+    """
+    Highest offered rate the network still keeps up with: throughput within
+    `efficiency` of the offered load. Past it the backlog grows without bound.
+    """
+    sustained = [row["offered_per_s"] for row in curve
+                 if row["throughput_per_s"] >= efficiency * row["offered_per_s"]]
+    return max(sustained) if sustained else 0.0
+
+
+if __name__ == "__main__":
+    rates = [2000, 5000, 10000, 14000, 18000, 20000, 25000, 30000, 35000, 40000]
+
+    for positions in (1, 2):
+        for arrivals in ARRIVALS:
+            curve = latency_curve(rates, arrivals, num_positions=positions)
+            print("=" * 72)
+            print(f"LATENCY UNDER LOAD: {arrivals} arrivals, {positions} memory position(s) per relay")
+            print("=" * 72)
+            print(f"{'offered/s':>10s} {'thru/s':>9s} {'p50 us':>9s} {'p95 us':>9s} {'p99 us':>10s} {'backlog':>8s}")
+            for row in curve:
+                print(f"{row['offered_per_s']:10.0f} {row['throughput_per_s']:9.0f} {row['p50_ns'] / 1e3:9.1f} "
+                      f"{row['p95_ns'] / 1e3:9.1f} {row['p99_ns'] / 1e3:10.1f} {row['backlog']:8d}")
+            print(f"Saturation point: ~{saturation_point(curve):.0f} req/s")
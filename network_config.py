@@ -0,0 +1,38 @@
+import os
+import yaml
+
+# ============================================================
+# CONFIG LOADER: reads config.yaml (nodes, channels, memory)
+# ============================================================
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.yaml")
+
+# Light in fiber: 200,000 km/s -> 5,000 ns per km
+NS_PER_KM = 5000
+
+
+def load_config(path=CONFIG_PATH):
+    """Loads the network configuration file as a plain dict."""
+    with open(path) as f:
+        return yaml.safe_load(f)
+
+
+def node_names(config):
+    """Node names in chain order (Alice -> ... -> David)."""
+    return [node["name"] for node in config["nodes"]]
+
+
+def channel_lengths(config):
+    """Fiber span lengths in km, one per channel."""
+    return [float(channel["length"]) for channel in config["channels"]]
+
+
+def channel_delays(config):
+    """Propagation delay (ns) of each fiber span."""
+    return [length * NS_PER_KM for length in channel_lengths(config)]
+
+
+def memory_coherence(config):
+    """Returns (T1, T2) of the quantum memories in ns; 0 means no decoherence."""
+    memory = config.get("memory", {})
+    return float(memory.get("T1", 0)), float(memory.get("T2", 0))
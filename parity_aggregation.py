@@ -0,0 +1,227 @@
+import heapq
+import itertools
+from collections import Counter
+
+import numpy as np
+
+from topology import adjacency, build_topology, spanning_tree
+
+# ============================================================
+# PARITY AGGREGATION for anonymous-transmission groups
+# The anonymous bit is the XOR of every party's X outcome. Three
+# ways to get it to everyone, in simulated ns:
+#   gather      - all send to one receiver, which broadcasts back
+#   tree        - XOR up a spanning tree, result back down
+#   all-reduce  - recursive doubling, log2(n) pairwise exchanges
+# Each node handles one message at a time (send or receive costs
+# PROCESS_NS), so O(n) messages into one node cost O(n) time.
+# ============================================================
+
+PROCESS_NS = 1000
+
+
+def shortest_delays(graph, source):
+    """Dijkstra over fiber delays (ns) from `source`."""
+    dist, heap = {source: 0.0}, [(0.0, source)]
+    while heap:
+        d, node = heapq.heappop(heap)
+        if d > dist[node]:
+            continue
+        for nbr, delay in graph[node].items():
+            if d + delay < dist.get(nbr, np.inf):
+                dist[nbr] = d + delay
+                heapq.heappush(heap, (d + delay, nbr))
+    return dist
+
+
+class MessageSim:
+    """Messages routed over shortest fiber paths; every node handles messages one at a time."""
+
+    def __init__(self, graph, process_ns=PROCESS_NS):
+        self.graph, self.process_ns = graph, process_ns
+        self.busy = {node: 0.0 for node in graph}
+        self.events, self.counter = [], itertools.count()
+        self.sent, self.received = Counter(), Counter()
+        self._dist = {}
+
+    def delay(self, src, dst):
+        if src not in self._dist:
+            self._dist[src] = shortest_delays(self.graph, src)
+        return self._dist[src][dst]
+
+    def send(self, time, src, dst, payload):
+        self.busy[src] = max(time, self.busy[src]) + self.process_ns
+        self.sent[src] += 1
+        arrive = self.busy[src] + self.delay(src, dst)
+        heapq.heappush(self.events, (arrive, next(self.counter), dst, src, payload))
+
+    def run(self, handler):
+        while self.events:
+            time, _, dst, src, payload = heapq.heappop(self.events)
+            self.busy[dst] = max(time, self.busy[dst]) + self.process_ns
+            self.received[dst] += 1
+            handler(self.busy[dst], dst, src, payload)
+
+
+def gather(graph, outcomes, receiver, process_ns=PROCESS_NS):
+    sim = MessageSim(graph, process_ns)
+    state = {"acc": outcomes[receiver], "count": 0}
+    known = {receiver: (0.0, outcomes[receiver])} if len(graph) == 1 else {}
+
+    def handler(time, node, src, payload):
+        kind, value = payload
+        if kind == "result":
+            known[node] = (time, value)
+            return
+        state["acc"] ^= value
+        state["count"] += 1
+        if state["count"] == len(graph) - 1:
+            known[receiver] = (time, state["acc"])
+            for other in graph:
+                if other != receiver:
+                    sim.send(time, receiver, other, ("result", state["acc"]))
+
+    for node in graph:
+        if node != receiver:
+            sim.send(0.0, node, receiver, ("outcome", outcomes[node]))
+    sim.run(handler)
+    return known, sim
+
+
+def tree_reduce(graph, outcomes, process_ns=PROCESS_NS):
+    root, parent = spanning_tree(graph)
+    children = {node: [] for node in graph}
+    for child, par in parent.items():
+        if par is not None:
+            children[par].append(child)
+    sim = MessageSim(graph, process_ns)
+    acc = dict(outcomes)
+    waiting = {node: len(children[node]) for node in graph}
+    known = {}
+
+    def finish_up(time, node):
+        if node == root:
+            broadcast(time, node, acc[node])
+        else:
+            sim.send(time, node, parent[node], ("up", acc[node]))
+
+    def broadcast(time, node, value):
+        known[node] = (time, value)
+        for child in children[node]:
+            sim.send(time, node, child, ("down", value))
+
+    def handler(time, node, src, payload):
+        kind, value = payload
+        if kind == "down":
+            broadcast(time, node, value)
+            return
+        acc[node] ^= value
+        waiting[node] -= 1
+        if waiting[node] == 0:
+            finish_up(time, node)
+
+    for node in graph:
+        if not children[node]:
+            finish_up(0.0, node)
+    sim.run(handler)
+    return known, sim
+
+
+def all_reduce(graph, outcomes, process_ns=PROCESS_NS):
+    """
+    Recursive doubling over the node order. With n not a power of two, the
+    n - m extra nodes first fold into partners among the first m, and get the
+    result back at the end.
+    """
+    nodes = list(graph)
+    n = len(nodes)
+    m = 1 << (n.bit_length() - 1)
+    rounds = m.bit_length() - 1
+    index = {node: i for i, node in enumerate(nodes)}
+    sim = MessageSim(graph, process_ns)
+    acc = dict(outcomes)
+    stage = {node: 0 for node in nodes}          # next exchange round
+    inbox = {node: {} for node in nodes}          # round -> partner value
+    folded = {node: index[node] + m >= n for node in nodes[:m]}
+    known = {}
+
+    def advance(time, node):
+        i = index[node]
+        while True:
+            k = stage[node]
+            if not folded[node]:
+                return
+            if k == rounds:
+                known[node] = (time, acc[node])
+                if i + m < n:
+                    sim.send(time, node, nodes[i + m], ("result", None, acc[node]))
+                return
+            if k in inbox[node]:
+                acc[node] ^= inbox[node].pop(k)
+                stage[node] += 1
+                if stage[node] < rounds:
+                    sim.send(time, node, nodes[i ^ (1 << stage[node])], ("exchange", stage[node], acc[node]))
+                continue
+            return
+
+    def handler(time, node, src, payload):
+        kind, k, value = payload
+        if kind == "result":
+            known[node] = (time, value)
+        elif kind == "fold":
+            acc[node] ^= value
+            folded[node] = True
+            if rounds:
+                sim.send(time, node, nodes[index[node] ^ 1], ("exchange", 0, acc[node]))
+            advance(time, node)
+        else:
+            inbox[node][k] = value
+            advance(time, node)
+
+    for i, node in enumerate(nodes):
+        if i >= m:
+            sim.send(0.0, node, nodes[i - m], ("fold", None, outcomes[node]))
+        elif folded[node]:
+            if rounds:
+                sim.send(0.0, node, nodes[i ^ 1], ("exchange", 0, acc[node]))
+            advance(0.0, node)
+    sim.run(handler)
+    return known, sim
+
+
+PROTOCOLS = {
+    "gather": lambda graph, outcomes: gather(graph, outcomes, next(iter(graph))),
+    "tree": tree_reduce,
+    "all-reduce": all_reduce,
+}
+
+
+def benchmark(kind, n, seed=0):
+    graph = adjacency(build_topology(kind, n))
+    rng = np.random.default_rng(seed)
+    outcomes = {node: int(b) for node, b in zip(graph, rng.integers(0, 2, n))}
+    parity = int(np.bitwise_xor.reduce(list(outcomes.values())))
+    rows = {}
+    for name, protocol in PROTOCOLS.items():
+        known, sim = protocol(graph, outcomes)
+        assert len(known) == n and all(value == parity for _, value in known.values()), name
+        rows[name] = {
+            "latency_ns": max(time for time, _ in known.values()),
+            "messages": sum(sim.sent.values()),
+            "max_sent": max(sim.sent.values(), default=0),
+            "max_received": max(sim.received.values(), default=0),
+        }
+    return rows
+
+
+if __name__ == "__main__":
+    print("=" * 76)
+    print("PARITY AGGREGATION: time until every party knows the XOR (10 km spans, 1 us/msg)")
+    print("=" * 76)
+    for kind in ("grid", "tree"):
+        print(f"{kind} topology")
+        print(f"{'n':>5s} {'protocol':>11s} {'latency us':>11s} {'messages':>9s} {'max sent':>9s} {'max recv':>9s}")
+        for n in (1, 4, 16, 64, 256):
+            for name, row in benchmark(kind, n).items():
+                print(f"{n:5d} {name:>11s} {row['latency_ns'] / 1e3:11.1f} {row['messages']:9d} "
+                      f"{row['max_sent']:9d} {row['max_received']:9d}")
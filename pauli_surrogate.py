@@ -0,0 +1,194 @@
+import math
+import time
+import numpy as np
+
+# ============================================================
+# ANALYTIC SURROGATE: Pauli-channel composition for the relay
+# Every noise source in the chain (DepolarNoiseModel, depolarize,
+# perfect swaps with Pauli feed-forward) is a Pauli channel, so the
+# end-to-end behaviour is the Klein-group convolution of the hops.
+# ============================================================
+
+# Pauli order used throughout: [I, X, Y, Z]
+IDENTITY_CHANNEL = np.array([1.0, 0.0, 0.0, 0.0])
+
+# Walsh-Hadamard matrix of Z2 x Z2: maps Pauli probabilities to eigenvalues
+_WH = np.array([[1, 1, 1, 1],
+                [1, 1, -1, -1],
+                [1, -1, 1, -1],
+                [1, -1, -1, 1]], dtype=float)
+
+
+def depolar_prob(depolar_rate, dwell_ns=0.0, time_independent=False):
+    """
+    Converts DepolarNoiseModel parameters into a per-hop depolarizing probability.
+    Time-dependent models use `depolar_rate` in Hz over the memory dwell time (ns).
+    """
+    rate = np.asarray(depolar_rate, dtype=float)
+    if time_independent:
+        return rate
+    return 1.0 - np.exp(-rate * np.asarray(dwell_ns, dtype=float) * 1e-9)
+
+
+def fibre_survival(length, p_loss_init=0.0, p_loss_length=0.0):
+    """Transmission probability of a span under FibreLossModel(p_loss_init, p_loss_length [dB/km])."""
+    length = np.asarray(length, dtype=float)
+    return (1.0 - p_loss_init) * 10 ** (-p_loss_length * length / 10.0)
+
+
+def depolarizing_channel(p):
+    """
+    Pauli vector(s) of ns.qubits.depolarize(prob=p): the qubit is replaced by
+    the maximally mixed state with probability p.
+    """
+    p = np.asarray(p, dtype=float)
+    return np.stack([1 - 0.75 * p, p / 4, p / 4, p / 4], axis=-1)
+
+
+def dephasing_channel(p):
+    """Pauli vector(s) of ns.qubits.dephase(prob=p): Z applied with probability p."""
+    p = np.asarray(p, dtype=float)
+    zero = np.zeros_like(p)
+    return np.stack([1 - p, zero, zero, p], axis=-1)
+
+
+def to_eigenvalues(channel):
+    """Pauli probabilities [pI, pX, pY, pZ] -> channel eigenvalues [1, lX, lY, lZ]."""
+    return np.asarray(channel, dtype=float) @ _WH.T
+
+
+def from_eigenvalues(eigenvalues):
+    """Channel eigenvalues [1, lX, lY, lZ] -> Pauli probabilities [pI, pX, pY, pZ]."""
+    return np.asarray(eigenvalues, dtype=float) @ _WH / 4.0
+
+
+def compose(*channels):
+    """
+    Exact composition of Pauli channels (order does not matter: Paulis commute up to phase).
+    Each argument may carry leading batch dimensions for parameter sweeps.
+    """
+    eig = np.ones(4)
+    for channel in channels:
+        eig = eig * to_eigenvalues(channel)
+    return from_eigenvalues(eig)
+
+
+def chain_channel(num_hops, p_hop, p_swap=0.0):
+    """
+    End-to-end Pauli channel on one half of a Bell pair after `num_hops` depolarizing
+    hops and `num_hops - 1` entanglement swaps with residual depolarizing `p_swap`.
+    A Pauli on either half of |b00> is equivalent to the same Pauli on the other half,
+    so every error in the chain can be pushed onto one qubit.
+    """
+    eig = to_eigenvalues(depolarizing_channel(p_hop)) ** num_hops
+    if num_hops > 1:
+        eig = eig * to_eigenvalues(depolarizing_channel(p_swap)) ** (num_hops - 1)
+    return from_eigenvalues(eig)
+
+
+def bell_fidelity(channel):
+    """Fidelity with ks.b00 of a Bell pair that has passed through `channel`."""
+    return np.asarray(channel)[..., 0]
+
+
+def parity_error(channel):
+    """
+    Probability that the anonymous X-basis parity bit is flipped.
+    Only Z and Y anticommute with the X-basis measurement.
+    """
+    channel = np.asarray(channel)
+    return channel[..., 2] + channel[..., 3]
+
+
+def repetition_error(bit_error, n=3, erasure=0.0):
+    """
+    Logical error of a length-n repetition code with majority vote (Goal 4).
+    `erasure` is the probability that a round is lost; like run_metrics_loop,
+    a lost round is counted as a wrong bit.
+    """
+    bit_error = np.asarray(bit_error, dtype=float)
+    e = erasure + (1 - erasure) * bit_error
+    return sum(math.comb(n, k) * e ** k * (1 - e) ** (n - k) for k in range(n // 2 + 1, n + 1))
+
+
+def estimate_chain(num_hops=3, depolar_rate=0.03, dwell_ns=0.0, time_independent=False,
+                   length=10, p_loss_init=0.0, p_loss_length=0.0, p_swap=0.0, repetitions=3):
+    """
+    Instant estimator for an N-hop relay with the same parameters the NetSquid scripts use.
+    Returns a dict of end-to-end metrics; array arguments broadcast for sweeps.
+    """
+    p_hop = depolar_prob(depolar_rate, dwell_ns, time_independent)
+    channel = chain_channel(num_hops, p_hop, p_swap)
+    arrival = fibre_survival(length, p_loss_init, p_loss_length) ** num_hops
+    bit_error = parity_error(channel)
+    return {
+        "pauli": channel,
+        "fidelity": bell_fidelity(channel),
+        "bit_error": bit_error,
+        "arrival_prob": arrival,
+        "logical_error": repetition_error(bit_error, repetitions, erasure=1 - arrival),
+    }
+
+
+def netsquid_bridge_fidelity(error_prob, num_runs=20):
+    """
+    Cross-check: replays the 4NodesNoiseModeDensity bridge (6 depolarized qubits,
+    two swaps, feed-forward at David) in NetSquid and returns the mean fidelity.
+    """
+    import netsquid as ns
+    import netsquid.qubits.ketstates as ks
+    from resource_states import create_noisy
+
+    fidelities = []
+    for _ in range(num_runs):
+        ns.sim_reset()
+        q1_a, q1_b = create_noisy("bell", noise="depolarize", prob=error_prob)
+        q2_b, q2_c = create_noisy("bell", noise="depolarize", prob=error_prob)
+        q3_c, q3_d = create_noisy("bell", noise="depolarize", prob=error_prob)
+
+        ns.qubits.operate([q1_b, q2_b], ns.CNOT)
+        ns.qubits.operate(q1_b, ns.H)
+        m1, _ = ns.qubits.measure(q1_b)
+        m2, _ = ns.qubits.measure(q2_b)
+        ns.qubits.operate([q2_c, q3_c], ns.CNOT)
+        ns.qubits.operate(q2_c, ns.H)
+        m3, _ = ns.qubits.measure(q2_c)
+        m4, _ = ns.qubits.measure(q3_c)
+
+        if (m2 + m4) % 2 == 1:
+            ns.qubits.operate(q3_d, ns.X)
+        if (m1 + m3) % 2 == 1:
+            ns.qubits.operate(q3_d, ns.Z)
+        fidelities.append(ns.qubits.fidelity([q1_a, q3_d], ks.b00))
+    return float(np.mean(fidelities))
+
+
+def bridge_fidelity(error_prob):
+    """Closed-form fidelity of the 3-segment bridge: 6 depolarized qubits, perfect swaps."""
+    return bell_fidelity(compose(*[depolarizing_channel(error_prob)] * 6))
+
+
+if __name__ == "__main__":
+    # 1. Goal 5 chain (run_simulation.py parameters, README's "3% per hop" reading)
+    est = estimate_chain(num_hops=3, depolar_rate=0.03, time_independent=True)
+    print("=" * 40)
+    print("PAULI SURROGATE: 3-HOP RELAY")
+    print("=" * 40)
+    print(f"Fidelity:        {est['fidelity']:.4f}")
+    print(f"Bit error:       {est['bit_error']:.4f}")
+    print(f"Logical error:   {est['logical_error']:.6f}")
+
+    # 2. Sweep speed
+    grid = np.linspace(0, 0.2, 1_000_000)
+    start = time.time()
+    estimate_chain(num_hops=3, depolar_rate=grid, time_independent=True)
+    print(f"1e6-point sweep: {time.time() - start:.3f} s")
+
+    # 3. Cross-check against the NetSquid DM bridge
+    for error_prob in [0.01, 0.02, 0.05]:
+        line = f"p={error_prob}: surrogate F={bridge_fidelity(error_prob):.4f}"
+        try:
+            line += f", NetSquid F={netsquid_bridge_fidelity(error_prob):.4f}"
+        except ImportError:
+            pass
+        print(line)
@@ -0,0 +1,177 @@
+import numpy as np
+
+from pauli_surrogate import compose, depolarizing_channel, repetition_error
+
+# ============================================================
+# ENTANGLEMENT PURIFICATION (BBPSSW / DEJMPS recurrence)
+# Two noisy pairs -> one better pair: bilateral CNOTs, measure the
+# sacrificed pair, keep only if both sides saw the same outcome.
+# The analytic recurrence works on Bell-diagonal coefficients
+# [A, B, C, D] = weights of [Phi+, Psi-, Psi+, Phi-]; a Pauli vector
+# [pI, pX, pY, pZ] on |b00> maps to A=pI, B=pY, C=pX, D=pZ.
+# ============================================================
+
+
+def pauli_to_bell(channel):
+    channel = np.asarray(channel, dtype=float)
+    return channel[..., [0, 2, 1, 3]]
+
+
+def bell_to_pauli(coeffs):
+    coeffs = np.asarray(coeffs, dtype=float)
+    return coeffs[..., [0, 2, 1, 3]]
+
+
+def dejmps_step(coeffs):
+    """One DEJMPS round (Deutsch et al. 1996). Returns (new coefficients, success probability)."""
+    A, B, C, D = np.moveaxis(np.asarray(coeffs, dtype=float), -1, 0)
+    norm = (A + B) ** 2 + (C + D) ** 2
+    new = np.stack([A ** 2 + B ** 2, 2 * C * D, C ** 2 + D ** 2, 2 * A * B], axis=-1) / norm[..., None]
+    return new, norm
+
+
+def bbpssw_step(coeffs):
+    """One BBPSSW round: twirl to a Werner state, then purify (Bennett et al. 1996)."""
+    F = np.asarray(coeffs, dtype=float)[..., 0]
+    e = (1 - F) / 3
+    norm = F ** 2 + 2 * F * e + 5 * e ** 2
+    F_new = (F ** 2 + e ** 2) / norm
+    e_new = (1 - F_new) / 3
+    return np.stack([F_new, e_new, e_new, e_new], axis=-1), norm
+
+
+STEPS = {"DEJMPS": dejmps_step, "BBPSSW": bbpssw_step}
+
+
+def purify(coeffs, rounds=1, protocol="DEJMPS"):
+    """
+    Recurrence purification for `rounds` rounds.
+    Returns (coefficients, expected raw pairs consumed per output pair).
+    """
+    step = STEPS[protocol]
+    cost = np.ones(np.shape(coeffs)[:-1])
+    for _ in range(rounds):
+        coeffs, p_success = step(coeffs)
+        cost = 2 * cost / p_success
+    return coeffs, cost
+
+
+def bridge_pairs(error_prob, num_segments=3, rounds=0, protocol="DEJMPS", where="end-to-end"):
+    """
+    The 4NodesNoise* bridge with purification inserted per segment or end-to-end.
+    Each raw segment pair has both qubits depolarized with `error_prob`.
+    Returns (end-to-end Bell coefficients, raw segment pairs consumed per output pair).
+    """
+    segment = pauli_to_bell(compose(depolarizing_channel(error_prob), depolarizing_channel(error_prob)))
+    if where == "per-segment":
+        segment, cost = purify(segment, rounds, protocol)
+        # Swapping is Pauli composition; every segment needs its own purified pair
+        channel = compose(*[bell_to_pauli(segment)] * num_segments)
+        return pauli_to_bell(channel), num_segments * cost
+    channel = compose(*[bell_to_pauli(segment)] * num_segments)
+    coeffs, cost = purify(pauli_to_bell(channel), rounds, protocol)
+    return coeffs, num_segments * cost
+
+
+def parity_error(coeffs):
+    """Anonymous X-parity error: Psi- (Y) and Phi- (Z) components."""
+    coeffs = np.asarray(coeffs)
+    return coeffs[..., 1] + coeffs[..., 3]
+
+
+def purify_netsquid(pair_keep, pair_sacrifice, protocol="DEJMPS", rng=None):
+    """
+    One purification round on NetSquid qubits. Each pair is (alice_qubit, remote_qubit)
+    sharing ~|b00>. Applies the protocol's local operations, bilateral CNOTs, measures
+    the sacrificed pair and compares outcomes. Returns True if `pair_keep` was kept.
+    """
+    import netsquid as ns
+    from netsquid.qubits.operators import Operator
+
+    a1, b1 = pair_keep
+    a2, b2 = pair_sacrifice
+    if protocol == "DEJMPS":
+        rx_plus = Operator("Rx+", np.array([[1, -1j], [-1j, 1]]) / np.sqrt(2))
+        rx_minus = Operator("Rx-", np.array([[1, 1j], [1j, 1]]) / np.sqrt(2))
+        for q in (a1, a2):
+            ns.qubits.operate(q, rx_plus)
+        for q in (b1, b2):
+            ns.qubits.operate(q, rx_minus)
+    else:
+        # BBPSSW twirl: random bilateral Pauli, then a random power of the X->Z->Y cycle
+        # (U on Alice, U* on Bob leaves |b00> invariant)
+        rng = rng or np.random.default_rng()
+        cycle = Operator("SH", np.array([[1, 1], [1j, -1j]]) / np.sqrt(2))
+        cycle_conj = Operator("SdgH", np.array([[1, 1], [-1j, 1j]]) / np.sqrt(2))
+        for pair in (pair_keep, pair_sacrifice):
+            pauli = [None, ns.X, ns.Y, ns.Z][rng.integers(4)]
+            if pauli is not None:
+                ns.qubits.operate(pair[0], pauli)
+                ns.qubits.operate(pair[1], pauli)
+            for _ in range(rng.integers(3)):
+                ns.qubits.operate(pair[0], cycle)
+                ns.qubits.operate(pair[1], cycle_conj)
+
+    ns.qubits.operate([a1, a2], ns.CNOT)
+    ns.qubits.operate([b1, b2], ns.CNOT)
+    m_a, _ = ns.qubits.measure(a2)
+    m_b, _ = ns.qubits.measure(b2)
+    ns.qubits.discard(a2)
+    ns.qubits.discard(b2)
+    return m_a == m_b
+
+
+def netsquid_purified_fidelity(error_prob, protocol="DEJMPS", num_runs=200):
+    """Monte-Carlo check of one round on two depolarized Bell pairs."""
+    import netsquid as ns
+    import netsquid.qubits.ketstates as ks
+
+    fidelities, kept = [], 0
+    for _ in range(num_runs):
+        pairs = []
+        for _ in range(2):
+            a, b = ns.qubits.create_qubits(2)
+            ns.qubits.operate(a, ns.H)
+            ns.qubits.operate([a, b], ns.CNOT)
+            ns.qubits.depolarize(a, prob=error_prob)
+            ns.qubits.depolarize(b, prob=error_prob)
+            pairs.append((a, b))
+        if purify_netsquid(pairs[0], pairs[1], protocol):
+            kept += 1
+            fidelities.append(ns.qubits.fidelity(list(pairs[0]), ks.b00))
+    return float(np.mean(fidelities)), kept / num_runs
+
+
+if __name__ == "__main__":
+    error_prob, target = 0.02, 1e-3
+
+    print("=" * 64)
+    print(f"PURIFICATION vs REPETITION (bridge, error_prob={error_prob}, target {target:g})")
+    print("=" * 64)
+    print("(pairs/bit = raw segment pairs consumed per delivered anonymous bit)")
+    raw, _ = bridge_pairs(error_prob)
+    e_raw = float(parity_error(raw))
+    print(f"raw bridge:        F={raw[0]:.4f}  parity error {e_raw:.4f}")
+
+    # 1. Classical repetition: n bridges (3 segment pairs each) per bit, majority vote
+    for n in (3, 5, 7, 9):
+        err = float(repetition_error(e_raw, n))
+        print(f"repetition n={n}:    {3 * n:6.2f} pairs/bit  error {err:.2e}"
+              f"{'  <- meets target' if err <= target else ''}")
+
+    # 2. Purification, per segment and end-to-end
+    for protocol in STEPS:
+        for where in ("per-segment", "end-to-end"):
+            for rounds in (1, 2, 3):
+                coeffs, cost = bridge_pairs(error_prob, rounds=rounds, protocol=protocol, where=where)
+                err = float(parity_error(coeffs))
+                print(f"{protocol} {where:11s} r={rounds}: {float(cost):6.2f} pairs/bit  "
+                      f"F={coeffs[0]:.4f}  error {err:.2e}{'  <- meets target' if err <= target else ''}")
+
+    try:
+        for protocol in STEPS:
+            f, p = netsquid_purified_fidelity(error_prob, protocol)
+            coeffs, _ = purify(pauli_to_bell(compose(*[depolarizing_channel(error_prob)] * 2)), 1, protocol)
+            print(f"NetSquid {protocol}: F={f:.4f} (analytic {coeffs[0]:.4f}), kept {p:.2f}")
+    except ImportError:
+        pass
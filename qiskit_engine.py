@@ -0,0 +1,164 @@
+import time
+import numpy as np
+from qiskit import QuantumCircuit, transpile
+from qiskit.circuit import Parameter
+from qiskit_aer import AerSimulator
+
+# ============================================================
+# QISKIT ANONYMOUS-BIT ENGINE (promoted from QIAPractice1.ipynb)
+# A whole message is sent as ONE batched Aer job: the two circuit
+# variants (secret bit 0 / 1) are transpiled once and reused for
+# every bit, and parities are decoded from the counts as arrays.
+# ============================================================
+
+
+def char_to_bits(char):
+    """Converts a character to 8 binary bits (MSB first)."""
+    return [int(b) for b in format(ord(char), '08b')]
+
+
+def message_to_bits(message):
+    """str or bytes -> uint8 array of bits, 8 per byte (MSB first)."""
+    data = message.encode() if isinstance(message, str) else bytes(message)
+    return np.unpackbits(np.frombuffer(data, dtype=np.uint8))
+
+
+def bits_to_message(bits):
+    """uint8 bit array -> bytes (length must be a multiple of 8)."""
+    return np.packbits(np.asarray(bits, dtype=np.uint8)).tobytes()
+
+
+def ghz_anonymous_circuit(sender_bit, num_parties=4, sender=0):
+    """
+    GHZ anonymous-transmission circuit: GHZ chain, Z on the sender if the bit is 1,
+    everyone rotates to the X basis and measures. Parity of the outcome = sender_bit.
+    """
+    qc = QuantumCircuit(num_parties, num_parties)
+    qc.h(0)
+    for q in range(num_parties - 1):
+        qc.cx(q, q + 1)
+    if sender_bit == 1:
+        qc.z(sender)
+    qc.h(range(num_parties))
+    qc.measure(range(num_parties), range(num_parties))
+    return qc
+
+
+def parameterized_circuit(num_parties=4, sender=0):
+    """
+    Single template with the secret as a phase: rz(pi * d) equals Z^d up to a
+    global phase, so binding d in {0, 1} reproduces both variants.
+    """
+    d = Parameter("d")
+    qc = QuantumCircuit(num_parties, num_parties)
+    qc.h(0)
+    for q in range(num_parties - 1):
+        qc.cx(q, q + 1)
+    qc.rz(np.pi * d, sender)
+    qc.h(range(num_parties))
+    qc.measure(range(num_parties), range(num_parties))
+    return qc, d
+
+
+def transpiled_variants(backend, num_parties=4, sender=0, optimization_level=1):
+    """Transpiles the bit-0 and bit-1 circuits once; index the result with the bit."""
+    circuits = [ghz_anonymous_circuit(bit, num_parties, sender) for bit in (0, 1)]
+    return transpile(circuits, backend, optimization_level=optimization_level)
+
+
+def _popcount(values):
+    if hasattr(np, "bitwise_count"):  # NumPy >= 2.0
+        return np.bitwise_count(values)
+    return np.array([bin(v).count("1") for v in values], dtype=np.int64)
+
+
+def parities_from_counts(counts_list):
+    """
+    Vectorized decoding: for each circuit's counts dict, returns the fraction of
+    shots with odd parity. Bitstrings are parsed once into an integer array.
+    """
+    sizes = np.array([len(c) for c in counts_list])
+    keys = np.array([int(k.replace(" ", ""), 2) for c in counts_list for k in c], dtype=np.int64)
+    values = np.array([v for c in counts_list for v in c.values()], dtype=np.int64)
+    odd = _popcount(keys) & 1
+    circuit = np.repeat(np.arange(len(counts_list)), sizes)
+    ones = np.bincount(circuit, weights=odd * values, minlength=len(counts_list))
+    shots = np.bincount(circuit, weights=values, minlength=len(counts_list))
+    return ones / shots
+
+
+def _run_parities(backend, circuits, shots):
+    """
+    Runs `circuits` as one job; 1 where more than half of a circuit's shots have odd
+    parity. A tie (even `shots`) decodes as 0, as application.majority_vote does.
+    """
+    if not circuits:
+        return np.zeros(0, dtype=np.uint8)
+    result = backend.run(circuits, shots=shots).result()
+    counts = [result.get_counts(i) for i in range(len(circuits))]
+    return (parities_from_counts(counts) > 0.5).astype(np.uint8)
+
+
+def send_bits(bits, backend=None, shots=1, num_parties=4, variants=None):
+    """
+    Sends every bit in one batched job. With shots > 1 the shots of a bit act as
+    a repetition code and the decoded bit is the majority parity (use an odd
+    shot count: ties decode as 0). Returns the decoded bit array.
+    """
+    backend = backend or AerSimulator()
+    variants = variants or transpiled_variants(backend, num_parties)
+    circuits = [variants[int(bit)] for bit in bits]
+    return _run_parities(backend, circuits, shots)
+
+
+def send_bits_parameterized(bits, backend=None, shots=1, num_parties=4):
+    """Same as send_bits but binds one transpiled parameterized template per bit."""
+    backend = backend or AerSimulator()
+    template, d = parameterized_circuit(num_parties)
+    t_qc = transpile(template, backend)
+    circuits = [t_qc.assign_parameters({d: int(bit)}) for bit in bits]
+    return _run_parities(backend, circuits, shots)
+
+
+def send_message(message, backend=None, shots=1, num_parties=4, variants=None):
+    """Anonymously sends a str/bytes message and returns the received bytes."""
+    bits = message_to_bits(message)
+    return bits_to_message(send_bits(bits, backend, shots, num_parties, variants))
+
+
+def run_anonymous_bit_sim(sender_bit):
+    """Per-bit reference from QIAPractice1: build, transpile and run one circuit."""
+    qc = ghz_anonymous_circuit(sender_bit)
+    backend = AerSimulator()
+    result = backend.run(transpile(qc, backend), shots=1).result().get_counts()
+    outcome_str = list(result.keys())[0]
+    bits = [int(b) for b in outcome_str]
+    return bits, sum(bits) % 2
+
+
+if __name__ == "__main__":
+    message = "QIA Foundation Challenge 2025!!"
+    repeats = 5
+
+    # 1. Per-bit loop (notebook behaviour)
+    start = time.time()
+    for _ in range(repeats):
+        received = [run_anonymous_bit_sim(bit)[1] for c in message for bit in char_to_bits(c)]
+    loop_rate = repeats / (time.time() - start)
+    assert bits_to_message(received).decode() == message
+
+    # 2. Batched job, transpiled variants reused across messages
+    backend = AerSimulator()
+    variants = transpiled_variants(backend)
+    start = time.time()
+    for _ in range(repeats):
+        received = send_message(message, backend, variants=variants)
+    batch_rate = repeats / (time.time() - start)
+    assert received.decode() == message
+
+    print("=" * 40)
+    print(f"QISKIT ENGINE ({len(message)}-byte message)")
+    print("=" * 40)
+    print(f"Per-bit loop: {loop_rate:.3f} messages/sec")
+    print(f"Batched job:  {batch_rate:.3f} messages/sec")
+    print(f"Speedup:      {batch_rate / loop_rate:.1f}x")
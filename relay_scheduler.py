@@ -0,0 +1,243 @@
+import heapq
+import itertools
+from collections import deque
+
+import numpy as np
+
+from network_config import load_config, node_names, channel_delays
+from pauli_surrogate import fibre_survival
+
+# ============================================================
+# MULTI-FLOW RELAY SCHEDULER
+# Several sender -> receiver sessions share Bob's and Charlie's
+# memory positions and the fiber time slots. Each fiber sends one
+# qubit per slot; a qubit parked at a relay holds a memory position
+# until it is forwarded. A policy (FIFO, round-robin, weighted-fair)
+# decides which flow's head-of-line qubit gets the next slot on each
+# fiber (qubits of one flow stay in order). All times are simulated
+# ns, as in NetSquid.
+# ============================================================
+
+
+class Flow:
+    """A logical session between two nodes of the chain."""
+
+    def __init__(self, name, src, dst, weight=1.0):
+        self.name, self.src, self.dst, self.weight = name, src, dst, weight
+
+
+class FifoPolicy:
+    """Oldest request first, across all flows."""
+
+    def enqueue(self, link, item):
+        pass
+
+    def pick(self, link, candidates):
+        return min(candidates, key=lambda item: item["submitted"])
+
+
+class RoundRobinPolicy:
+    """Cycles over the flows waiting at each fiber."""
+
+    def __init__(self):
+        self.last = {}
+
+    def enqueue(self, link, item):
+        pass
+
+    def pick(self, link, candidates):
+        names = sorted({item["flow"].name for item in candidates})
+        last = self.last.get(link)
+        flow = next((n for n in names if last is None or n > last), names[0])
+        self.last[link] = flow
+        return next(c for c in candidates if c["flow"].name == flow)
+
+
+class WeightedFairPolicy:
+    """
+    Self-clocked fair queueing per fiber: each queued qubit gets a finish tag
+    max(virtual time, flow's last tag) + 1 / weight; the smallest tag is served.
+    """
+
+    def __init__(self):
+        self.virtual, self.last_tag = {}, {}
+
+    def enqueue(self, link, item):
+        key = (link, item["flow"].name)
+        tag = max(self.virtual.get(link, 0.0), self.last_tag.get(key, 0.0)) + 1.0 / item["flow"].weight
+        self.last_tag[key] = tag
+        item.setdefault("tags", {})[link] = tag
+
+    def pick(self, link, candidates):
+        item = min(candidates, key=lambda c: c["tags"][link])
+        self.virtual[link] = item["tags"][link]
+        return item
+
+
+POLICIES = {"fifo": FifoPolicy, "round-robin": RoundRobinPolicy, "weighted-fair": WeightedFairPolicy}
+
+
+class RelayNetwork:
+    """
+    Persistent discrete-event model of the relay chain built from config.yaml.
+    Submit requests with submit(), advance with run(until); stats() summarises.
+    `success_prob` is the per-span survival (e.g. pauli_surrogate.fibre_survival);
+    a lost qubit frees its slot and is recorded as lost.
+    """
+
+    def __init__(self, config=None, num_positions=1, slot_ns=10000, policy="fifo",
+                 success_prob=1.0, seed=None):
+        config = config or load_config()
+        self.names = node_names(config)
+        self.delays = channel_delays(config)
+        self.capacity = [None] + [num_positions] * (len(self.names) - 2) + [None]
+        self.slot_ns, self.success_prob = slot_ns, success_prob
+        self.policy = POLICIES[policy]() if isinstance(policy, str) else policy
+        self.rng = np.random.default_rng(seed)
+
+        self.now = 0.0
+        self.events, self.counter = [], itertools.count()
+        self.queues = [{} for _ in self.delays]       # per fiber: flow name -> waiting qubits
+        self.link_busy = [False] * len(self.delays)
+        self.occupied = [0] * len(self.names)
+        self.occupancy_area = [0.0] * len(self.names)
+        self.peak = [0] * len(self.names)
+        self.records = []
+
+    # ---------------- events ----------------
+    def _push(self, time, kind, payload):
+        heapq.heappush(self.events, (time, next(self.counter), kind, payload))
+
+    def _advance(self, time):
+        for node, used in enumerate(self.occupied):
+            self.occupancy_area[node] += used * (time - self.now)
+        self.now = time
+
+    def submit(self, flow, time=None):
+        """Queues one transmission request of `flow` at `time` (default: now)."""
+        time = self.now if time is None else time
+        item = {"flow": flow, "submitted": time, "hops_ns": 0.0}
+        self._push(time, "arrive", (item, flow.src))
+        return item
+
+    def run(self, until=None):
+        """Processes events up to `until` ns (or until the network is idle)."""
+        while self.events and (until is None or self.events[0][0] <= until):
+            time, _, kind, payload = heapq.heappop(self.events)
+            self._advance(time)
+            if kind == "arrive":
+                self._arrive(*payload)
+            else:
+                self.link_busy[payload] = False
+            self._dispatch()
+        if until is not None and until > self.now:
+            self._advance(until)
+
+    def _arrive(self, item, node):
+        if node == item["flow"].dst:
+            item["delivered"] = self.now
+            self.records.append(item)
+            return
+        if node != item["flow"].src:
+            item["parked_at"] = node   # holds the position reserved when it was sent
+        item["queued"] = self.now
+        self.queues[node].setdefault(item["flow"].name, deque()).append(item)
+        self.policy.enqueue(node, item)
+
+    def _dispatch(self):
+        for link, queue in enumerate(self.queues):
+            if self.link_busy[link]:
+                continue
+            nxt, cap = link + 1, self.capacity[link + 1]
+            room = cap is None or self.occupied[nxt] < cap
+            candidates = [q[0] for q in queue.values() if q and (room or q[0]["flow"].dst == nxt)]
+            if not candidates:
+                continue
+            item = self.policy.pick(link, candidates)
+            queue[item["flow"].name].popleft()
+            item["waited"] = item.get("waited", 0.0) + self.now - item["queued"]
+
+            if "parked_at" in item:
+                self.occupied[item.pop("parked_at")] -= 1
+            self.link_busy[link] = True
+            self._push(self.now + self.slot_ns, "free", link)
+
+            if self.rng.random() >= self.success_prob:
+                item["lost"] = self.now
+                self.records.append(item)
+                continue
+            if item["flow"].dst != nxt:
+                self.occupied[nxt] += 1
+                self.peak[nxt] = max(self.peak[nxt], self.occupied[nxt])
+            item["hops_ns"] += self.delays[link]
+            self._push(self.now + self.delays[link], "arrive", (item, nxt))
+
+    # ---------------- metrics ----------------
+    def stats(self, since=0.0):
+        """Per-flow throughput / delay and per-relay memory occupancy."""
+        duration = max(self.now - since, 1e-9)
+        flows = {}
+        for item in self.records:
+            if item["submitted"] < since:
+                continue
+            row = flows.setdefault(item["flow"].name, {"delivered": 0, "lost": 0, "sojourn": [], "queueing": []})
+            if "delivered" in item:
+                row["delivered"] += 1
+                row["sojourn"].append(item["delivered"] - item["submitted"])
+                row["queueing"].append(item["waited"])
+            else:
+                row["lost"] += 1
+        summary = {}
+        for name, row in flows.items():
+            summary[name] = {
+                "throughput_per_s": row["delivered"] / (duration * 1e-9),
+                "delivered": row["delivered"],
+                "lost": row["lost"],
+                "mean_queueing_ns": float(np.mean(row["queueing"])) if row["queueing"] else 0.0,
+                "sojourn_ns": np.array(row["sojourn"]),
+            }
+        memory = {self.names[n]: {"mean": self.occupancy_area[n] / max(self.now, 1e-9), "peak": self.peak[n]}
+                  for n in range(1, len(self.names) - 1)}
+        return summary, memory
+
+    def backlog(self):
+        return sum(len(q) for queue in self.queues for q in queue.values())
+
+
+def periodic_arrivals(network, flow, rate_per_s, until_ns, offset_ns=0.0):
+    """Submits requests of `flow` at a fixed rate until `until_ns`."""
+    period = 1e9 / rate_per_s
+    for t in np.arange(offset_ns, until_ns, period):
+        network.submit(flow, float(t))
+
+
+if __name__ == "__main__":
+    horizon = 2e8  # 0.2 s of simulated time
+    flows = [Flow("A->D heavy", 0, 3, weight=2), Flow("A->D light", 0, 3, weight=1),
+             Flow("B->D", 1, 3, weight=1)]
+
+    print("=" * 72)
+    print("MULTI-FLOW RELAY SCHEDULING (slot 10 us, 40k req/s per flow)")
+    print("=" * 72)
+    for positions in (1, 2, 4):
+        for policy in POLICIES:
+            net = RelayNetwork(num_positions=positions, policy=policy)
+            for k, flow in enumerate(flows):
+                periodic_arrivals(net, flow, 40000, horizon, offset_ns=k * 1000)
+            net.run(until=horizon)
+            summary, memory = net.stats()
+            line = " | ".join(f"{name}: {row['throughput_per_s'] / 1e3:5.1f}k/s q={row['mean_queueing_ns'] / 1e3:7.1f}us"
+                              for name, row in summary.items())
+            mem = ", ".join(f"{n} {m['mean']:.2f}/{m['peak']}" for n, m in memory.items())
+            print(f"pos={positions} {policy:13s} {line} | mem {mem}")
+
+    # Lossy spans: per-hop survival of the bridges' FibreLossModel(0.1, 0.25) over 10 km
+    survival = float(fibre_survival(10, 0.1, 0.25))
+    net = RelayNetwork(num_positions=2, policy="weighted-fair", success_prob=survival, seed=1)
+    for k, flow in enumerate(flows):
+        periodic_arrivals(net, flow, 40000, horizon, offset_ns=k * 1000)
+    net.run(until=horizon)
+    summary, _ = net.stats()
+    print(f"lossy spans (survival {survival:.3f}/hop), pos=2 weighted-fair:")
+    for name, row in summary.items():
+        print(f"  {name:11s} {row['throughput_per_s'] / 1e3:5.1f}k/s delivered, {row['lost']} lost")
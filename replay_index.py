@@ -0,0 +1,195 @@
+import hashlib
+import json
+import logging
+import os
+import time
+import numpy as np
+
+# ============================================================
+# FAILURE REPLAY INDEX: per-trial seeds, replay only the failures
+# dispatch() derives one seed per trial from the run's base seed
+# (splitmix64 of base and trial index, vectorized, so 10^7 seeds
+# cost milliseconds) and the sampling engines reseed before every
+# trial (NetSquid: ns.set_random_state). A trial is then a pure
+# function of (configuration, seed). Failing or anomalous trials
+# (lost qubits, wrong parity, wrong decoded bit, fidelity below a
+# threshold) go to an append-only JSON-lines index:
+#   {"config": <hash>, "engine": ..., "params": {...}}  once
+#   {"config": <hash>, "trial": i, "seed": s, "why": [...]}  per trial
+# replay() re-runs exactly those trials with DEBUG tracing on and
+# checks that they fail the same way.
+# ============================================================
+
+logger = logging.getLogger(__name__)
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _splitmix64(x):
+    x = x + _GOLDEN
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def trial_seeds(base_seed, trials):
+    """
+    63-bit seeds of trials `trials` (a count or an array of indices) of a run with
+    `base_seed` (no birthday collisions at 10^7 trials, unlike 32-bit seeds).
+    """
+    idx = np.arange(trials) if np.isscalar(trials) else np.asarray(trials)
+    with np.errstate(over="ignore"):
+        mixed = _splitmix64(_splitmix64(np.uint64(base_seed)) ^ idx.astype(np.uint64))
+    return (mixed >> np.uint64(1)).astype(np.int64)
+
+
+def seed_netsquid(seed):
+    """Resets NetSquid's process-global random state from a 63-bit seed."""
+    import netsquid as ns
+    seed = int(seed)
+    ns.set_random_state(rng=np.random.RandomState([seed >> 32, seed & 0xFFFFFFFF]))
+
+
+def config_hash(params, engine):
+    """Hash of everything besides the seed that decides a trial's outcome."""
+    spec = {"params": params, "engine": engine}
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def classify(result, secret_bit=0, min_fidelity=None):
+    """
+    {trial index: [reasons]} for the failing trials of a sampling engine's result:
+    "lost" (a round's qubit was lost), "parity" (an arrived round decoded the wrong
+    bit), "decoded" (the majority vote was wrong), "fidelity" (below `min_fidelity`).
+    """
+    checks = {}
+    if "lost" in result:
+        lost = result["lost"]
+        checks["lost"] = lost.any(axis=1)
+        checks["parity"] = ((result["bits"] != secret_bit) & ~lost).any(axis=1)
+        checks["decoded"] = result["decoded"] != secret_bit
+    if min_fidelity is not None and "fidelities" in result:
+        fidelities = np.asarray(result["fidelities"], dtype=float)
+        checks["fidelity"] = ~(fidelities >= min_fidelity)   # NaN (lost) counts as failing
+    if not checks:
+        return {}
+    failing = np.flatnonzero(np.any(list(checks.values()), axis=0))
+    return {int(i): [why for why, flags in checks.items() if flags[i]] for i in failing}
+
+
+class ReplayIndex:
+    """Append-only JSON-lines index of failing trials at `path`."""
+
+    def __init__(self, path):
+        self.path = path
+        self._configs = set(self.load(path)[0]) if os.path.exists(path) else set()
+
+    def record(self, job, result, min_fidelity=None):
+        """Appends the failing trials of `result` (from dispatch) and returns how many."""
+        failures = classify(result, job.secret_bit, min_fidelity)
+        if not failures:
+            return 0
+        params = job.params()
+        key = config_hash(params, result["engine"])
+        lines = []
+        if key not in self._configs:
+            lines.append({"config": key, "engine": result["engine"], "params": params})
+            self._configs.add(key)
+        seeds = result["seeds"]
+        lines += [{"config": key, "trial": i, "seed": int(seeds[i]), "why": why} for i, why in failures.items()]
+        with open(self.path, "a") as f:
+            f.write("".join(json.dumps(line, separators=(",", ":")) + "\n" for line in lines))
+        return len(failures)
+
+    @staticmethod
+    def load(path):
+        """Returns ({config hash: {"engine", "params"}}, [trial records])."""
+        configs, trials = {}, []
+        with open(path) as f:
+            for line in f:
+                entry = json.loads(line)
+                if "params" in entry:
+                    configs[entry["config"]] = {"engine": entry["engine"], "params": entry["params"]}
+                else:
+                    trials.append(entry)
+        return configs, trials
+
+
+def replay(path, jobs=None, min_fidelity=None, trace=True):
+    """
+    Re-executes the indexed trials with their seeds, grouped by configuration, with
+    per-round DEBUG tracing. Jobs are rebuilt from the stored parameters; pass
+    `jobs` ({config hash: Job}) for jobs with a custom runner.
+    Returns [(entry, reasons now)], reasons now == entry["why"] if it reproduced.
+    """
+    from dispatcher import Job, dispatch
+
+    configs, entries = ReplayIndex.load(path)
+    jobs = jobs or {}
+    replayed = []
+    for key, config in configs.items():
+        group = [e for e in entries if e["config"] == key]
+        if not group:
+            continue
+        if key in jobs:
+            job = jobs[key]
+        else:
+            params = dict(config["params"])
+            if params.pop("runner") is not None:
+                raise ValueError(f"config {key} used a custom runner; pass its Job in `jobs`")
+            job = Job(**params)
+        result = dispatch(job, engine=config["engine"], seeds=[e["seed"] for e in group], trace=trace)
+        now = classify(result, job.secret_bit, min_fidelity)
+        replayed += [(e, now.get(i, [])) for i, e in enumerate(group)]
+    return replayed
+
+
+if __name__ == "__main__":
+    import sys
+    import tempfile
+    from dispatcher import Job, dispatch
+
+    if len(sys.argv) > 1:   # python replay_index.py <index.jsonl>: replay with tracing
+        logging.basicConfig(level=logging.DEBUG, format="%(message)s")
+        for entry, now in replay(sys.argv[1]):
+            print(f"trial {entry['trial']} seed {entry['seed']}: indexed {entry['why']}, replayed {now}")
+        sys.exit()
+
+    start = time.perf_counter()
+    seeds = trial_seeds(2024, 10 ** 7)
+    print("=" * 78)
+    print(f"FAILURE REPLAY INDEX: {len(seeds):.0e} trial seeds in {(time.perf_counter() - start) * 1e3:.0f} ms, "
+          f"{len(np.unique(seeds))} distinct")
+    print("=" * 78)
+
+    trials = 20000
+    job = Job(depolar_rate=0.02, p_loss_length=0.002, trials=trials, samples=True)
+    path = os.path.join(tempfile.mkdtemp(), "failures.jsonl")
+    index = ReplayIndex(path)
+    full = dispatch(job, engine="stabilizer", seed=7)
+    failing = index.record(job, full)
+    print(f"full run:  {trials} trials on {full['engine']} in {full['wall_s']:.2f} s, "
+          f"{failing} failing trials indexed ({os.path.getsize(path) / 1e3:.1f} kB)")
+
+    start = time.perf_counter()
+    replayed = replay(path, trace=False)
+    replay_s = time.perf_counter() - start
+    same = sum(now == entry["why"] for entry, now in replayed)
+    print(f"replay:    {len(replayed)} trials in {replay_s:.2f} s, {same} reproduce the same failure")
+    decoded = [e for e, _ in replayed if "decoded" in e["why"]]
+    print(f"wrong decoded bit: {len(decoded)} trials, e.g. trial {decoded[0]['trial']} seed {decoded[0]['seed']}")
+
+    # One trial with the full per-round trace
+    logging.basicConfig(level=logging.DEBUG, format="    %(message)s")
+    dispatch(job, engine="stabilizer", seeds=[decoded[0]["seed"]], trace=True)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    try:
+        ns_job = Job(trials=50, depolar_rate=0.03, time_independent=False, dwell_ns=None, samples=True)
+        ns_result = dispatch(ns_job, engine="netsquid", seed=7)
+        failing = index.record(ns_job, ns_result)
+        again = dispatch(ns_job, engine="netsquid", seed=7)
+        print(f"NetSquid: {failing} failing trials indexed; rerun identical: "
+              f"{np.array_equal(ns_result['bits'], again['bits'])}")
+    except ImportError:
+        pass
@@ -0,0 +1,195 @@
+import time
+import numpy as np
+
+from dm_engine import I2, X, Y, Z, H, CNOT, apply_kraus, apply_unitary, depolar_kraus, dephase_kraus
+from pauli_surrogate import depolarizing_channel, dephasing_channel
+
+# ============================================================
+# RESOURCE-STATE LIBRARY: noisy Bell / GHZ states, precomputed
+# The noisy scripts build every pair from |00> with H + CNOT and
+# then call ns.qubits.depolarize on each qubit, once per trial.
+# Per-qubit depolarize / dephase are Pauli channels, so the noisy
+# state is an ensemble of a few Pauli-rotated kets (4 for a Bell
+# pair) with fixed probabilities. The ensemble and its density
+# matrix are built once per (kind, n, noise, prob) and cached;
+# a trial then only samples a ket (KET formalism) or assigns the
+# DM (DM formalism) with ns.qubits.assign_qstate.
+# ============================================================
+
+NOISE_CHANNELS = {
+    None: lambda p: np.array([1.0, 0.0, 0.0, 0.0]),
+    "depolarize": depolarizing_channel,
+    "dephase": dephasing_channel,
+}
+
+_PAULIS = (I2, X, Y, Z)
+
+# In-process caches: (kind, n, noise, prob) -> ensemble / DM / StateSampler
+_ENSEMBLES, _DMS, _SAMPLERS = {}, {}, {}
+
+
+def ideal_ket(kind="bell", n=2):
+    """(|0...0> + |1...1>)/sqrt(2); "bell" is the 2-qubit case (ks.b00)."""
+    if kind == "bell":
+        n = 2
+    elif kind != "ghz":
+        raise ValueError(f"Unknown resource state '{kind}'")
+    ket = np.zeros(2 ** n, dtype=complex)
+    ket[0] = ket[-1] = 1 / np.sqrt(2)
+    return ket
+
+
+def _key(kind, n, noise, prob):
+    if noise not in NOISE_CHANNELS:
+        raise ValueError(f"Unknown noise '{noise}', expected one of {list(NOISE_CHANNELS)}")
+    return kind, 2 if kind == "bell" else n, noise, 0.0 if noise is None else float(prob)
+
+
+def _canonical(ket):
+    """Ket with its global phase fixed, as a hashable key."""
+    ket = ket * np.exp(-1j * np.angle(ket[np.argmax(np.abs(ket) > 1e-12)]))
+    return (np.round(ket, 12) + 0.0).tobytes(), ket   # + 0.0 folds -0.0 into 0.0
+
+
+def ensemble(kind="bell", n=2, noise=None, prob=0.0):
+    """
+    The noisy state as (kets, probs): `noise` ("depolarize" or "dephase", as
+    ns.qubits.depolarize / dephase with `prob`) on every qubit of the ideal state.
+    Identical kets (up to global phase) are merged, so a Bell pair has at most 4.
+    """
+    key = _key(kind, n, noise, prob)
+    if key not in _ENSEMBLES:
+        n = key[1]
+        channel = NOISE_CHANNELS[noise](key[3])
+        states = {_canonical(ideal_ket(kind, n))[0]: (ideal_ket(kind, n), 1.0)}
+        for q in range(n):
+            merged = {}
+            for ket, p in states.values():
+                for pauli, weight in zip(_PAULIS, channel):
+                    if weight == 0:
+                        continue
+                    tensor = np.moveaxis(np.tensordot(pauli, ket.reshape((2,) * n), axes=([1], [q])), 0, q)
+                    k, new = _canonical(tensor.reshape(-1))
+                    merged[k] = (new, merged.get(k, (new, 0.0))[1] + p * weight)
+            states = merged
+        kets = np.array([ket for ket, _ in states.values()])
+        probs = np.array([p for _, p in states.values()])
+        kets.setflags(write=False)
+        probs.setflags(write=False)
+        _ENSEMBLES[key] = (kets, probs / probs.sum())
+    return _ENSEMBLES[key]
+
+
+def density_matrix(kind="bell", n=2, noise=None, prob=0.0):
+    """Cached density matrix of the same state (read-only; copy before editing)."""
+    key = _key(kind, n, noise, prob)
+    if key not in _DMS:
+        kets, probs = ensemble(*key)
+        rho = np.einsum("k,ki,kj->ij", probs, kets, kets.conj())
+        rho.setflags(write=False)
+        _DMS[key] = rho
+    return _DMS[key]
+
+
+def state_sampler(kind="bell", n=2, noise=None, prob=0.0):
+    """Cached NetSquid StateSampler over the ensemble, for QSource(state_sampler=...)."""
+    from netsquid.qubits.state_sampler import StateSampler
+
+    key = _key(kind, n, noise, prob)
+    if key not in _SAMPLERS:
+        kets, probs = ensemble(*key)
+        _SAMPLERS[key] = StateSampler([ket.reshape(-1, 1) for ket in kets], list(probs))
+    return _SAMPLERS[key]
+
+
+def assign(qubits, kind="bell", noise=None, prob=0.0, rng=None):
+    """
+    Puts `qubits` in the noisy state: the DM under the DM formalism, otherwise a
+    ket sampled from the ensemble (with NetSquid's random state unless `rng` is given).
+    """
+    import netsquid as ns
+    from netsquid.qubits.qformalism import QFormalism
+
+    n = len(qubits)
+    if ns.get_qstate_formalism() == QFormalism.DM:
+        ns.qubits.assign_qstate(qubits, np.array(density_matrix(kind, n, noise, prob)))
+        return qubits
+    kets, probs = ensemble(kind, n, noise, prob)
+    rng = rng or ns.get_random_state()
+    ket = kets[rng.choice(len(kets), p=probs)] if len(kets) > 1 else kets[0]
+    ns.qubits.assign_qstate(qubits, ket.reshape(-1, 1))
+    return qubits
+
+
+def create_noisy(kind="bell", n=2, noise=None, prob=0.0, rng=None):
+    """New qubits holding the noisy resource state."""
+    import netsquid as ns
+    return assign(ns.qubits.create_qubits(2 if kind == "bell" else n), kind, noise, prob, rng)
+
+
+def replay_dm(n, noise, prob):
+    """Reference path: |0...0>, H + CNOTs, then the noise channel on every qubit."""
+    rho = np.zeros((1, 2 ** n, 2 ** n), dtype=complex)
+    rho[0, 0, 0] = 1
+    rho = apply_unitary(rho, H, [0], n)
+    for q in range(1, n):   # CNOT chain (q-1 -> q): same GHZ as the fan-out, contiguous qubits
+        rho = apply_unitary(rho, CNOT, [q - 1, q], n)
+    kraus = {"depolarize": depolar_kraus, "dephase": dephase_kraus}[noise](prob)
+    for q in range(n):
+        rho = apply_kraus(rho, kraus, q, n)
+    return rho[0]
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(3)
+    trials = 2000
+
+    print("=" * 78)
+    print(f"RESOURCE STATES: per-trial setup, replayed gates vs cached state ({trials} trials)")
+    print("=" * 78)
+    print(f"{'state':>12s} {'noise':>11s} {'kets':>5s} {'build us':>9s} {'replay DM us':>13s} "
+          f"{'cached us':>10s} {'max |diff|':>11s}")
+    for kind, n in (("bell", 2), ("ghz", 3), ("ghz", 4), ("ghz", 6)):
+        for noise, prob in (("depolarize", 0.05), ("dephase", 0.05)):
+            start = time.perf_counter()
+            kets, probs = ensemble(kind, n, noise, prob)
+            rho = density_matrix(kind, n, noise, prob)
+            build_us = (time.perf_counter() - start) * 1e6
+
+            start = time.perf_counter()
+            for _ in range(trials):
+                reference = replay_dm(n, noise, prob)
+            replay_us = (time.perf_counter() - start) / trials * 1e6
+
+            start = time.perf_counter()
+            for _ in range(trials):
+                kets, probs = ensemble(kind, n, noise, prob)
+                ket = kets[rng.choice(len(kets), p=probs)]
+                rho = np.array(density_matrix(kind, n, noise, prob))
+            cached_us = (time.perf_counter() - start) / trials * 1e6
+            print(f"{kind + str(n):>12s} {noise:>11s} {len(kets):5d} {build_us:9.0f} {replay_us:13.1f} "
+                  f"{cached_us:10.1f} {np.abs(reference - rho).max():11.1e}")
+
+    try:
+        import netsquid as ns
+        import netsquid.qubits.ketstates as ks
+
+        for prob in (0.01, 0.05):
+            start = time.perf_counter()
+            for _ in range(trials):
+                a, b = ns.qubits.create_qubits(2)
+                ns.qubits.operate(a, ns.H)
+                ns.qubits.operate([a, b], ns.CNOT)
+                ns.qubits.depolarize(a, prob=prob)
+                ns.qubits.depolarize(b, prob=prob)
+            replay_us = (time.perf_counter() - start) / trials * 1e6
+            start = time.perf_counter()
+            fidelity = 0.0
+            for _ in range(trials):
+                pair = create_noisy("bell", noise="depolarize", prob=prob)
+                fidelity += ns.qubits.fidelity(pair, ks.b00)
+            assign_us = (time.perf_counter() - start) / trials * 1e6
+            print(f"NetSquid Bell p={prob}: replay {replay_us:.1f} us, assign {assign_us:.1f} us "
+                  f"(incl. fidelity), mean F {fidelity / trials:.4f}")
+    except ImportError:
+        pass
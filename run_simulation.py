@@ -2,38 +2,48 @@ import time
 import netsquid as ns
 from netsquid.nodes import Node
 from netsquid.components import QuantumChannel, QSource, SourceStatus, QuantumMemory
-from netsquid.qubits.state_sampler import StateSampler
-import netsquid.qubits.ketstates as ks
 from netsquid.components.models import DepolarNoiseModel, FixedDelayModel
 
 # Import the protocol logic you commented in application.py
-from application import anonymous_transmit_bit, majority_vote
+from application import anonymous_transmit_bit
+from dispatcher import Job, dispatch
+from qubit_lifecycle import release
+from replay_index import ReplayIndex
+from resource_states import state_sampler
 
 ALICE_SECRET = 0  # The bit Alice is sending anonymously
 
-def simulate_abcd_chain():
+def build_abcd_network(loss_model=None, noise_model=None, suffix="", relay_on_arrival=False):
     """
-    Physical Layer Simulation: Alice -> Bob -> Charlie -> David (30km).
-    This implements the 'Anonymous Entanglement' primitive from the 
-    Christandl & Wehner research paper.
+    Nodes, 10km fibers and Alice's EPR source of the ABCD chain, in the current
+    simulation (call ns.sim_reset() first). Returns (alice, bob, charlie, david, source).
+    An optional `loss_model` (e.g. FibreLossModel) is attached to every fiber;
+    `noise_model` replaces the relays' DepolarNoiseModel(depolar_rate=0.03).
+    `suffix` is appended to every name (several copies in one Network). With
+    `relay_on_arrival`, Bob and Charlie store and forward each qubit the moment it
+    arrives, so one ns.sim_run() carries it to David's memory (batched_chain).
     """
-    ns.sim_reset()
-    
     # 1. Setup Nodes
-    alice = Node("Alice", port_names=["out_B"], qmemory=QuantumMemory("A_Mem", num_positions=1))
-    bob = Node("Bob", port_names=["in_A", "out_C"], qmemory=QuantumMemory("B_Mem", num_positions=1))
-    charlie = Node("Charlie", port_names=["in_B", "out_D"], qmemory=QuantumMemory("C_Mem", num_positions=1))
-    david = Node("David", port_names=["in_C"], qmemory=QuantumMemory("D_Mem", num_positions=1))
+    alice = Node("Alice" + suffix, port_names=["out_B"], qmemory=QuantumMemory("A_Mem" + suffix, num_positions=1))
+    bob = Node("Bob" + suffix, port_names=["in_A", "out_C"],
+               qmemory=QuantumMemory("B_Mem" + suffix, num_positions=1))
+    charlie = Node("Charlie" + suffix, port_names=["in_B", "out_D"],
+                   qmemory=QuantumMemory("C_Mem" + suffix, num_positions=1))
+    david = Node("David" + suffix, port_names=["in_C"], qmemory=QuantumMemory("D_Mem" + suffix, num_positions=1))
     
     # 2. Setup Noise (Goal 5: Fidelity 0.97)
-    noise_model = DepolarNoiseModel(depolar_rate=0.03)
+    if noise_model is None:
+        noise_model = DepolarNoiseModel(depolar_rate=0.03)
     for node in [bob, charlie, david]:
         node.qmemory.models["quantum_noise_model"] = noise_model
 
     # 3. Setup 10km Fibers
     delay = 50000 
     def connect(n1, n2, p1, p2, name):
-        chan = QuantumChannel(name, length=10, models={"delay_model": FixedDelayModel(delay=delay)})
+        models = {"delay_model": FixedDelayModel(delay=delay)}
+        if loss_model is not None:
+            models["loss_model"] = loss_model
+        chan = QuantumChannel(name + suffix, length=10, models=models)
         n1.ports[p1].connect(chan.ports["send"])
         chan.ports["recv"].connect(n2.ports[p2])
 
@@ -42,22 +52,46 @@ def simulate_abcd_chain():
     connect(charlie, david, "out_D", "in_C", "Ch_CD")
 
     # Routing
-    bob.ports["in_A"].forward_input(bob.qmemory.ports["qin0"])
-    charlie.ports["in_B"].forward_input(charlie.qmemory.ports["qin0"])
-    david.ports["in_C"].forward_input(david.qmemory.ports["qin0"])
+    if relay_on_arrival:
+        _relay_on_arrival(bob, "in_A", "out_C")
+        _relay_on_arrival(charlie, "in_B", "out_D")
+        _relay_on_arrival(david, "in_C", None)
+    else:
+        bob.ports["in_A"].forward_input(bob.qmemory.ports["qin0"])
+        charlie.ports["in_B"].forward_input(charlie.qmemory.ports["qin0"])
+        david.ports["in_C"].forward_input(david.qmemory.ports["qin0"])
 
     # 4. Source Logic (EPR/Bell Pair)
-    source = QSource("EPR_Source", state_sampler=StateSampler([ks.b00]), num_ports=2, status=SourceStatus.EXTERNAL)
+    source = QSource("EPR_Source" + suffix, state_sampler=state_sampler("bell"), num_ports=2, status=SourceStatus.EXTERNAL)
     alice.add_subcomponent(source)
     source.ports["qout1"].forward_output(alice.ports["out_B"])
     source.ports["qout0"].connect(alice.qmemory.ports["qin0"])
-
+    return alice, bob, charlie, david, source
+
+def _relay_on_arrival(node, in_port, out_port):
+    """Puts an arriving qubit in memory position 0 and, at relays, pops and sends it on."""
+    def handler(message):
+        qubit = message.items[0] if message.items else None
+        if qubit is None:   # lost in the fiber
+            return
+        node.qmemory.put(qubit, positions=[0])
+        if out_port is not None:
+            q, = node.qmemory.pop(0)
+            node.ports[out_port].tx_output(q)
+    node.ports[in_port].bind_input_handler(handler)
+
+def run_abcd_round(network, secret_bit=ALICE_SECRET):
+    """
+    One anonymous round on a network from build_abcd_network.
+    Returns (m_alice, m_david); m_david is None if the qubit was lost.
+    """
+    alice, bob, charlie, david, source = network
     source.trigger()
     
     # 5. Alice applies the ANON protocol logic (Z-gate if bit is 1)
     # This is where Goal 1 & 2 meet the research paper logic
     ns.sim_run()
-    m_alice = anonymous_transmit_bit(alice, secret_bit=ALICE_SECRET, is_sender=True)
+    m_alice = anonymous_transmit_bit(alice, secret_bit=secret_bit, is_sender=True)
 
     # 6. Propagation through Relays
     for relay, next_port in [(bob, "out_C"), (charlie, "out_D")]:
@@ -68,37 +102,64 @@ def simulate_abcd_chain():
 
     # 7. Final Measurement at David
     ns.sim_run()
+    m_david = None
     if david.qmemory.peek(0)[0] is not None:
         m_david = anonymous_transmit_bit(david, is_sender=False)
-        return 0 if m_alice == m_david else 1
-    return 1
 
-def run_metrics_loop(num_trials=100):
-    success_count = 0
+    # 8. Release whatever a lost or late qubit left behind in the memories
+    release(alice, bob, charlie, david)
+    return m_alice, m_david
+
+def simulate_abcd_chain(secret_bit=ALICE_SECRET, loss_model=None, noise_model=None):
+    """
+    Physical Layer Simulation: Alice -> Bob -> Charlie -> David (30km).
+    This implements the 'Anonymous Entanglement' primitive from the 
+    Christandl & Wehner research paper.
+    Returns the parity David decodes (equal to `secret_bit` without noise),
+    or None if the qubit was lost on the way (a heralded erasure).
+    Optional `loss_model` / `noise_model` as in build_abcd_network.
+    """
+    ns.sim_reset()
+    m_alice, m_david = run_abcd_round(build_abcd_network(loss_model, noise_model), secret_bit)
+    if m_david is None:
+        return None
+    return 0 if m_alice == m_david else 1
+
+def run_metrics_loop(num_trials=100, job=None, engine=None, seed=None, index_path=None, min_fidelity=None):
+    """
+    Goal 5 metrics through dispatcher.dispatch. The default job is this chain as
+    built above (DepolarNoiseModel(0.03) memories, dwell set by the event
+    simulation), which only NetSquid runs exactly; other jobs or a named
+    `engine` may go to a cheaper backend. Every trial runs from a seed derived
+    from `seed`; with `index_path`, failing trials (lost qubit, wrong parity or
+    decoded bit, fidelity below `min_fidelity`) are appended to that replay
+    index (python replay_index.py <index_path> re-runs them with tracing).
+    """
+    job = job or Job(trials=num_trials, depolar_rate=0.03, time_independent=False, dwell_ns=None,
+                     secret_bit=ALICE_SECRET)
     start_wall_clock = time.time()
 
     print(f"Starting QIA Challenge Goal 5 Simulation...")
-
-    for i in range(num_trials):
-        round_results = []
-        for _ in range(3): # Repetition Code Length 3
-            outcome = simulate_abcd_chain()
-            round_results.append(outcome)
-        
-        # Majority Vote (Goal 4)
-        if majority_vote(round_results) == 0:
-            success_count += 1
+    result = dispatch(job, engine, seed=seed)
 
     total_time = time.time() - start_wall_clock
-    accuracy = (success_count / num_trials) * 100
-    speed = (num_runs / 8) / total_time if 'num_runs' in locals() else (num_trials / 8) / total_time
+    accuracy = result["accuracy"] * 100
+    speed = (job.trials / 8) / total_time
 
     print("\n" + "="*40)
     print("FINAL QIA SUBMISSION METRICS")
     print("="*40)
+    print(f"Engine:   {result['engine']} ({result['reason']})")
     print(f"Accuracy: {accuracy:.2f}%")
     print(f"Speed:    {speed:.4f} Bytes/sec")
+    print(f"Seed:     {result['seed']}")
+    if index_path is not None:
+        failing = ReplayIndex(index_path).record(job, result, min_fidelity)
+        print(f"Failing:  {failing} trials -> {index_path}")
     print("="*40)
+    return result
 
 if __name__ == "__main__":
-    run_metrics_loop(100)
\ No newline at end of file
+    import sys
+    # python run_simulation.py [index.jsonl]: failing trials go to the replay index only on request
+    run_metrics_loop(100, index_path=sys.argv[1] if len(sys.argv) > 1 else None)
\ No newline at end of file
@@ -0,0 +1,204 @@
+import time
+import numpy as np
+
+# ============================================================
+# STABILIZER TABLEAU (Aaronson & Gottesman 2004, CHP)
+# n qubits -> 2n generator rows (n destabilizers, n stabilizers).
+# X and Z parts are bit-packed 64 qubits per uint64 word, so the
+# tableau takes ~n^2/2 bytes (2n rows x 2n bits; 128 KiB at
+# n=512) and every gate is a handful of NumPy ops over all rows.
+# Gate set of the anonymous protocol: H, CNOT, X, Z, Pauli noise,
+# Z and X measurement (plus S / Y measurement for fidelity
+# estimation). Needs NumPy >= 2.0 (np.bitwise_count).
+# ============================================================
+
+_ONE = np.uint64(1)
+
+
+def _popcount(words):
+    return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+
+
+def _rowsum(xh, zh, rh, xi, zi, ri):
+    """
+    Generator h := h * i (AG rowsum), broadcast over rows. The phase exponent is
+    2 rh + 2 ri + sum_j g(xi, zi, xh, zh) mod 4, g counted with packed popcounts.
+    """
+    y1, x1, z1 = xi & zi, xi & ~zi, ~xi & zi
+    y2, x2, z2 = xh & zh, xh & ~zh, ~xh & zh
+    plus = (y1 & z2) | (x1 & y2) | (z1 & x2)
+    minus = (y1 & x2) | (x1 & z2) | (z1 & y2)
+    phase = 2 * rh.astype(np.int64) + 2 * ri.astype(np.int64) + _popcount(plus) - _popcount(minus)
+    return xh ^ xi, zh ^ zi, ((phase % 4) // 2).astype(np.uint8)
+
+
+def _product(x, z, r):
+    """Product of mutually commuting generators, reduced pairwise (order does not matter)."""
+    while len(x) > 1:
+        half = len(x) // 2
+        px, pz, pr = _rowsum(x[:half], z[:half], r[:half], x[half:2 * half], z[half:2 * half], r[half:2 * half])
+        x, z, r = np.concatenate([px, x[2 * half:]]), np.concatenate([pz, z[2 * half:]]), np.concatenate([pr, r[2 * half:]])
+    return x[0], z[0], r[0]
+
+
+class Tableau:
+    """Stabilizer state of n qubits, initialised to |0...0>."""
+
+    def __init__(self, n):
+        self.n, self.words = n, (n + 63) // 64
+        self.x = np.zeros((2 * n, self.words), dtype=np.uint64)
+        self.z = np.zeros((2 * n, self.words), dtype=np.uint64)
+        self.r = np.zeros(2 * n, dtype=np.uint8)
+        for q in range(n):
+            w, b = divmod(q, 64)
+            self.x[q, w] |= _ONE << np.uint64(b)       # destabilizer X_q
+            self.z[n + q, w] |= _ONE << np.uint64(b)   # stabilizer Z_q
+
+    @property
+    def nbytes(self):
+        return self.x.nbytes + self.z.nbytes + self.r.nbytes
+
+    def _col(self, part, q):
+        w, b = divmod(q, 64)
+        return (part[:, w] >> np.uint64(b)) & _ONE, w, np.uint64(b)
+
+    def mask(self, qubits):
+        """Packed row with the bits of `qubits` set."""
+        m = np.zeros(self.words, dtype=np.uint64)
+        qubits = np.asarray(qubits, dtype=np.int64)
+        np.bitwise_or.at(m, qubits // 64, _ONE << (qubits % 64).astype(np.uint64))
+        return m
+
+    # ---------------- gates ----------------
+    def h(self, q):
+        xq, w, b = self._col(self.x, q)
+        zq, _, _ = self._col(self.z, q)
+        self.r ^= (xq & zq).astype(np.uint8)
+        swap = (xq ^ zq) << b
+        self.x[:, w] ^= swap
+        self.z[:, w] ^= swap
+
+    def h_all(self, mask):
+        """H on every qubit in `mask` at once."""
+        self.r ^= (_popcount(self.x & self.z & mask) & 1).astype(np.uint8)
+        swap = (self.x ^ self.z) & mask
+        self.x ^= swap
+        self.z ^= swap
+
+    def s(self, q):
+        xq, w, b = self._col(self.x, q)
+        zq, _, _ = self._col(self.z, q)
+        self.r ^= (xq & zq).astype(np.uint8)
+        self.z[:, w] ^= xq << b
+
+    def cnot(self, c, t):
+        xc, wc, bc = self._col(self.x, c)
+        zc, _, _ = self._col(self.z, c)
+        xt, wt, bt = self._col(self.x, t)
+        zt, _, _ = self._col(self.z, t)
+        self.r ^= (xc & zt & (xt ^ zc ^ _ONE)).astype(np.uint8)
+        self.x[:, wt] ^= xc << bt
+        self.z[:, wc] ^= zt << bc
+
+    def pauli(self, x_mask, z_mask):
+        """Applies X on `x_mask` and Z on `z_mask` (both packed; Y where both are set)."""
+        flips = _popcount(self.z & x_mask) + _popcount(self.x & z_mask)
+        self.r ^= (flips & 1).astype(np.uint8)
+
+    def x_gate(self, q):
+        self.pauli(self.mask([q]), np.zeros(self.words, dtype=np.uint64))
+
+    def z_gate(self, q):
+        self.pauli(np.zeros(self.words, dtype=np.uint64), self.mask([q]))
+
+    def depolarize(self, p, rng, qubits=None):
+        """ns.qubits.depolarize(prob=p) on each qubit: a uniformly random Pauli with probability p."""
+        qubits = np.arange(self.n) if qubits is None else np.asarray(qubits)
+        hit = rng.random(len(qubits)) < p
+        kind = rng.integers(0, 4, len(qubits))
+        self.pauli(self.mask(qubits[hit & ((kind == 1) | (kind == 2))]),
+                   self.mask(qubits[hit & ((kind == 3) | (kind == 2))]))
+
+    # ---------------- measurement ----------------
+    def measure_z(self, q, rng):
+        n = self.n
+        xq, w, b = self._col(self.x, q)
+        stab = np.flatnonzero(xq[n:])
+        if len(stab) == 0:
+            # Deterministic: Z_q is the product of the stabilizers paired with destabilizers that anticommute
+            rows = n + np.flatnonzero(xq[:n])
+            return int(_product(self.x[rows], self.z[rows], self.r[rows])[2])
+
+        p = n + stab[0]
+        rows = np.flatnonzero(xq)
+        rows = rows[rows != p]
+        self.x[rows], self.z[rows], self.r[rows] = _rowsum(
+            self.x[rows], self.z[rows], self.r[rows], self.x[p], self.z[p], self.r[p])
+        self.x[p - n], self.z[p - n], self.r[p - n] = self.x[p], self.z[p], self.r[p]
+        outcome = int(rng.integers(2))
+        self.x[p] = 0
+        self.z[p] = 0
+        self.z[p, w] = _ONE << b
+        self.r[p] = outcome
+        return outcome
+
+    def measure_x(self, q, rng):
+        self.h(q)
+        return self.measure_z(q, rng)
+
+    def measure_y(self, q, rng):
+        for _ in range(3):   # S^dagger maps Y -> X
+            self.s(q)
+        return self.measure_x(q, rng)
+
+
+def ghz_tableau(n):
+    """(|0...0> + |1...1>)/sqrt(2): H on qubit 0, CNOT fan-out."""
+    tab = Tableau(n)
+    tab.h(0)
+    for q in range(1, n):
+        tab.cnot(0, q)
+    return tab
+
+
+def anonymous_round(n, secret_bit, sender=0, error_prob=0.0, rng=None):
+    """
+    One GHZ anonymous round (application.anonymous_transmit_bit at every node):
+    Z on the sender if the bit is 1, depolarizing noise on each qubit,
+    X measurement everywhere. Returns the announced parity.
+    """
+    rng = rng or np.random.default_rng()
+    tab = ghz_tableau(n)
+    if secret_bit:
+        tab.z_gate(sender)
+    if error_prob:
+        tab.depolarize(error_prob, rng)
+    tab.h_all(tab.mask(range(n)))
+    parity = 0
+    for q in range(n):
+        parity ^= tab.measure_z(q, rng)
+    return parity
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(11)
+    error_prob = 0.01
+
+    print("=" * 72)
+    print("STABILIZER TABLEAU: GHZ anonymous rounds")
+    print("=" * 72)
+    print(f"{'n':>5s} {'tableau':>10s} {'statevector':>13s} {'ms/round':>9s} {'noiseless ok':>13s} "
+          f"{'error (p=0.01)':>15s} {'analytic':>9s}")
+    for n in (4, 8, 16, 32, 64, 128, 256, 512):
+        ok = all(anonymous_round(n, bit, sender=n // 2, rng=rng) == bit for bit in (0, 1, 1, 0))
+
+        trials = max(100, 8000 // n)
+        start = time.perf_counter()
+        errors = sum(anonymous_round(n, 1, error_prob=error_prob, rng=rng) != 1 for _ in range(trials))
+        ms = (time.perf_counter() - start) / trials * 1e3
+
+        # A Y or Z on any qubit flips the parity: p/2 per qubit
+        analytic = (1 - (1 - error_prob) ** n) / 2
+        sv = f"2^{n + 4} B"  # complex128 amplitudes
+        print(f"{n:5d} {Tableau(n).nbytes / 1024:8.1f}KB {sv:>13s} {ms:9.2f} {str(ok):>13s} "
+              f"{errors / trials:15.3f} {analytic:9.3f}")
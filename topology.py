@@ -0,0 +1,269 @@
+import math
+import time
+from collections import deque
+
+import numpy as np
+
+from network_config import load_config, node_names, NS_PER_KM
+
+# ============================================================
+# TOPOLOGIES + TREE-FUSION GHZ DISTRIBUTION
+# Builds chain / star / ring / grid / tree networks in the same
+# nodes + channels format as config.yaml, and distributes an n-party
+# GHZ state by making one Bell pair per spanning-tree edge (all in
+# parallel) and fusing them locally at every node in ceil(log2 deg)
+# rounds, instead of walking one qubit down the chain hop by hop.
+# ============================================================
+
+GATE_NS = 1000      # local gate (H, CNOT)
+MEASURE_NS = 2000   # local Z measurement
+
+
+def build_topology(kind, num_nodes, length=10, fidelity=0.97, branching=2, rows=None):
+    """
+    Returns a config dict (nodes, channels) for a `kind` network of `num_nodes` nodes:
+    chain, star (N0 is the hub), ring, grid (rows x cols, row-major) or tree (`branching`-ary).
+    """
+    names = [f"N{i}" for i in range(num_nodes)]
+    if kind == "chain":
+        edges = [(i, i + 1) for i in range(num_nodes - 1)]
+    elif kind == "star":
+        edges = [(0, i) for i in range(1, num_nodes)]
+    elif kind == "ring":
+        edges = [(i, (i + 1) % num_nodes) for i in range(num_nodes)]
+    elif kind == "grid":
+        rows = rows or int(math.isqrt(num_nodes))
+        cols = math.ceil(num_nodes / rows)
+        edges = [(i, i + 1) for i in range(num_nodes - 1) if (i + 1) % cols]
+        edges += [(i, i + cols) for i in range(num_nodes - cols)]
+    elif kind == "tree":
+        edges = [((i - 1) // branching, i) for i in range(1, num_nodes)]
+    else:
+        raise ValueError(f"Unknown topology: {kind}")
+    return {
+        "nodes": [{"name": name} for name in names],
+        "channels": [{"node1": names[a], "node2": names[b], "length": length, "fidelity": fidelity}
+                     for a, b in edges],
+    }
+
+
+def load_topology(path):
+    """
+    Reads a network config. A file with a `topology:` section (kind, num_nodes, ...)
+    is expanded with build_topology; otherwise nodes/channels are used as written.
+    """
+    config = load_config(path)
+    if "topology" in config:
+        config = {**config, **build_topology(**config["topology"])}
+    return config
+
+
+def adjacency(config):
+    """{node: {neighbour: delay_ns}} from the channel list."""
+    graph = {name: {} for name in node_names(config)}
+    for channel in config["channels"]:
+        delay = float(channel["length"]) * NS_PER_KM
+        graph[channel["node1"]][channel["node2"]] = delay
+        graph[channel["node2"]][channel["node1"]] = delay
+    return graph
+
+
+def _hops(graph, source):
+    dist = {source: 0}
+    queue = deque([source])
+    while queue:
+        node = queue.popleft()
+        for nbr in graph[node]:
+            if nbr not in dist:
+                dist[nbr] = dist[node] + 1
+                queue.append(nbr)
+    return dist
+
+
+def spanning_tree(graph):
+    """
+    BFS tree from the graph centre (smallest eccentricity), so the tree depth
+    is the network radius. Returns (root, {child: parent}).
+    """
+    root = min(graph, key=lambda node: (max(_hops(graph, node).values()), node))
+    parent, queue = {root: None}, deque([root])
+    while queue:
+        node = queue.popleft()
+        for nbr in sorted(graph[node]):
+            if nbr not in parent:
+                parent[nbr] = node
+                queue.append(nbr)
+    return root, parent
+
+
+def sequential_ghz(config, gate_ns=GATE_NS):
+    """
+    Current scheme: one qubit walks the chain in config order and every node
+    CNOTs it onto a fresh local qubit before forwarding. Depth and latency grow
+    with every hop.
+    """
+    graph = adjacency(config)
+    names = node_names(config)
+    latency = gate_ns  # Bell pair at the first node
+    for a, b in zip(names, names[1:]):
+        latency += graph[a][b] + gate_ns
+    return {"depth": len(names) - 1, "quantum_ns": latency, "operations": len(names)}
+
+
+def tree_ghz(config, gate_ns=GATE_NS, measure_ns=MEASURE_NS):
+    """
+    Tree fusion. Every tree edge (parent -> child) gets a Bell pair in parallel;
+    a node of degree d then merges its d local halves pairwise: CNOT + Z measurement
+    per merge, ceil(log2 d) rounds. Each outcome is an X flip on the merged-in
+    component (a Pauli frame). X-basis parity measurements of the anonymous
+    protocol are unaffected by X flips, so no feed-forward is waited for.
+
+    Returns depth (fusion rounds), quantum_ns (all parties hold their qubit),
+    classical_ns (every frame bit has reached its node, for general GHZ use).
+    """
+    graph = adjacency(config)
+    root, parent = spanning_tree(graph)
+    degree = {node: 0 for node in graph}
+    arrival = {node: 0.0 for node in graph}
+    for child, par in parent.items():
+        if par is not None:
+            degree[child] += 1
+            degree[par] += 1
+            arrival[child] = max(arrival[child], gate_ns + graph[par][child])
+            arrival[par] = max(arrival[par], gate_ns)
+
+    rounds = {node: math.ceil(math.log2(d)) if d > 1 else 0 for node, d in degree.items()}
+    done = {node: arrival[node] + rounds[node] * (gate_ns + measure_ns) for node in graph}
+
+    # Frame bits of a merge at v travel the tree to every node of the merged-in side
+    tree = {node: {} for node in graph}
+    for child, par in parent.items():
+        if par is not None:
+            tree[child][par] = tree[par][child] = graph[par][child]
+    classical = max(done.values())
+    for node in graph:
+        if rounds[node]:
+            dist = _tree_delays(tree, node)
+            classical = max(classical, done[node] + max(dist.values()))
+
+    merges = sum(max(d - 1, 0) for d in degree.values())
+    return {
+        "depth": max(rounds.values()),
+        "quantum_ns": max(done.values()),
+        "classical_ns": classical,
+        "operations": 2 * (len(graph) - 1) + 2 * merges,
+        "root": root,
+    }
+
+
+def _tree_delays(tree, source):
+    dist, stack = {source: 0.0}, [source]
+    while stack:
+        node = stack.pop()
+        for nbr, delay in tree[node].items():
+            if nbr not in dist:
+                dist[nbr] = dist[node] + delay
+                stack.append(nbr)
+    return dist
+
+
+# ---------------- statevector check of the fusion protocol (small n) ----------------
+
+def _apply(state, labels, gate, qubits):
+    axes = [labels.index(q) for q in qubits]
+    k = len(qubits)
+    state = np.moveaxis(state, axes, range(k))
+    shape = state.shape
+    state = (gate @ state.reshape(2 ** k, -1)).reshape(shape)
+    return np.moveaxis(state, range(k), axes)
+
+
+_X = np.array([[0, 1], [1, 0]])
+_CNOT = np.array([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, 1], [0, 0, 1, 0]])
+
+
+def _measure(state, labels, qubit, rng):
+    axis = labels.index(qubit)
+    state = np.moveaxis(state, axis, 0)
+    p1 = float(np.sum(np.abs(state[1]) ** 2))
+    outcome = int(rng.random() < p1)
+    state = state[outcome] / np.sqrt(p1 if outcome else 1 - p1)
+    return state, labels[:axis] + labels[axis + 1:], outcome
+
+
+def fusion_fidelity(config, seed=0):
+    """
+    Runs the tree-fusion protocol on a state vector (2(n-1) qubits, so n <= 8)
+    with random measurement outcomes, applies the Pauli frame and returns the
+    fidelity with the n-party GHZ state. Should be 1.
+    """
+    rng = np.random.default_rng(seed)
+    graph = adjacency(config)
+    _, parent = spanning_tree(graph)
+    edges = [(par, child) for child, par in parent.items() if par is not None]
+
+    labels = []
+    state = np.ones(1, dtype=complex)
+    local = {node: [] for node in graph}
+    for par, child in edges:
+        bell = np.array([1, 0, 0, 1], dtype=complex) / np.sqrt(2)
+        state = np.multiply.outer(state, bell.reshape(2, 2)).reshape(-1)
+        labels += [(par, child, par), (par, child, child)]
+        local[par].append(labels[-2])
+        local[child].append(labels[-1])
+    state = state.reshape((2,) * len(labels))
+
+    # Pauli frame: union-find over qubits, X flips tracked per surviving qubit
+    comp = {q: {q, (q[0], q[1], q[1] if q[2] == q[0] else q[0])} for q in labels}
+    frame = {q: 0 for q in labels}
+    for node, qubits in local.items():
+        qubits = list(qubits)
+        while len(qubits) > 1:
+            survivors = []
+            for keep, target in zip(qubits[::2], qubits[1::2]):
+                state = _apply(state, labels, _CNOT, [keep, target])
+                state, labels, m = _measure(state, labels, target, rng)
+                # m compares the raw values; the frames say how each side differs from its own logical value
+                flip = m ^ frame[keep] ^ frame[target]
+                merged = comp[keep] | comp[target]
+                merged.discard(target)
+                for q in comp[target] - {target}:
+                    frame[q] ^= flip
+                for q in merged:
+                    comp[q] = merged
+                survivors.append(keep)
+            if len(qubits) % 2:
+                survivors.append(qubits[-1])
+            qubits = survivors
+
+    for q in labels:
+        if frame[q]:
+            state = _apply(state, labels, _X, [q])
+    ghz = np.zeros(state.size, dtype=complex)
+    ghz[0] = ghz[-1] = 1 / np.sqrt(2)
+    return float(abs(np.vdot(ghz, state.reshape(-1))) ** 2)
+
+
+if __name__ == "__main__":
+    print("=" * 78)
+    print("GHZ DISTRIBUTION: sequential chain vs tree fusion (10 km spans)")
+    print("=" * 78)
+    for kind in ("chain", "star", "ring", "grid", "tree"):
+        config = build_topology(kind, 6, rows=2)
+        print(f"statevector check, {kind:5s} n=6: fidelity {fusion_fidelity(config, seed=3):.6f}")
+
+    for n in (4, 6, 8):
+        start = time.perf_counter()
+        fusion_fidelity(build_topology("tree", n))
+        print(f"statevector cost, tree n={n}: {2 * (n - 1)} qubits, "
+              f"{(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    print(f"{'n':>3s} {'topology':>9s} {'depth':>5s} {'quantum us':>11s} {'classical us':>13s} {'ops':>5s}")
+    for n in (4, 8, 16, 32, 64):
+        seq = sequential_ghz(build_topology("chain", n))
+        print(f"{n:3d} {'linear':>9s} {seq['depth']:5d} {seq['quantum_ns'] / 1e3:11.1f} {'-':>13s} "
+              f"{seq['operations']:5d}")
+        for kind in ("chain", "star", "ring", "grid", "tree"):
+            fused = tree_ghz(build_topology(kind, n))
+            print(f"{n:3d} {kind:>9s} {fused['depth']:5d} {fused['quantum_ns'] / 1e3:11.1f} "
+                  f"{fused['classical_ns'] / 1e3:13.1f} {fused['operations']:5d}")
@@ -0,0 +1,203 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import warnings
+
+import numpy as np
+import qiskit
+import qiskit_aer
+from qiskit import QuantumCircuit, qpy, transpile
+from qiskit_aer import AerSimulator
+from qiskit_aer.noise import NoiseModel
+
+from qiskit_engine import ghz_anonymous_circuit, parities_from_counts
+
+# ============================================================
+# TRANSPILE + NOISE-MODEL CACHE for the fake IBM backends
+# QIAPractice3/4 rebuild FakeMarrakesh, its noise model and the
+# transpiled GHZ circuit for every sender bit. Here both variants
+# (bit 0 / 1) are transpiled once per (backend, level, layout),
+# stored on disk under a hash key and reused across runs/kernels.
+# ============================================================
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".transpile_cache")
+
+# In-process cache: key -> (simulator, variants)
+_MEMORY_CACHE = {}
+
+
+def get_backend(backend_name):
+    """Instantiates a fake backend by class name, e.g. "FakeMarrakesh"."""
+    from qiskit_ibm_runtime import fake_provider
+    return getattr(fake_provider, backend_name)()
+
+
+def cache_key(backend_name, optimization_level=3, initial_layout=None,
+              num_parties=4, sender=0, seed_transpiler=None):
+    """Hash of everything that changes the transpiled circuits or the noise model."""
+    import qiskit_ibm_runtime   # ships the fake backends' calibration snapshots
+
+    spec = {
+        "backend": backend_name,
+        "optimization_level": optimization_level,
+        "initial_layout": list(initial_layout) if initial_layout is not None else None,
+        "num_parties": num_parties,
+        "sender": sender,
+        "seed_transpiler": seed_transpiler,
+        "qiskit": qiskit.__version__,
+        "qiskit_aer": qiskit_aer.__version__,
+        "qiskit_ibm_runtime": qiskit_ibm_runtime.__version__,
+    }
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def _paths(cache_dir, key):
+    return os.path.join(cache_dir, f"{key}.qpy"), os.path.join(cache_dir, f"{key}.noise.json")
+
+
+def _active_qubits(circuits):
+    """Physical qubits touched by any instruction of the transpiled circuits."""
+    return sorted({c.find_bit(q).index for c in circuits for inst in c.data for q in inst.qubits})
+
+
+def _compact_circuit(circuit, index):
+    """Re-indexes a transpiled circuit onto len(index) qubits (physical -> compact)."""
+    compact = QuantumCircuit(len(index), circuit.num_clbits)
+    for inst in circuit.data:
+        qargs = [compact.qubits[index[circuit.find_bit(q).index]] for q in inst.qubits]
+        cargs = [compact.clbits[circuit.find_bit(c).index] for c in inst.clbits]
+        compact.append(inst.operation, qargs, cargs)
+    return compact
+
+
+def _compact_noise_model(noise_model, index):
+    """
+    NoiseModel.to_dict() with only the errors acting on the active qubits, re-indexed
+    like the circuits; all-qubit (default) errors are kept as they are. The full
+    156-qubit model is ~17 MB and makes every Aer run take seconds.
+    """
+    errors = []
+    for error in noise_model.to_dict()["errors"]:
+        if "gate_qubits" in error:
+            if not all(set(qubits) <= index.keys() for qubits in error["gate_qubits"]):
+                continue
+            error = dict(error, gate_qubits=[[index[q] for q in qubits] for qubits in error["gate_qubits"]])
+        errors.append(error)
+    return {"errors": errors}
+
+
+def _noise_model(spec):
+    """Rebuilds a NoiseModel from _compact_noise_model's dict."""
+    with warnings.catch_warnings():   # from_dict is deprecated but still the inverse of to_dict
+        warnings.simplefilter("ignore", DeprecationWarning)
+        return NoiseModel.from_dict({"errors": spec["errors"]})
+
+
+def _json_default(value):
+    """Kraus matrices (complex ndarrays) as {"re", "im"}; see _json_object."""
+    if isinstance(value, np.ndarray):
+        return {"re": value.real.tolist(), "im": value.imag.tolist()}
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _json_object(obj):
+    return np.array(obj["re"]) + 1j * np.array(obj["im"]) if obj.keys() == {"re", "im"} else obj
+
+
+def _build(backend_name, optimization_level, initial_layout, num_parties, sender, seed_transpiler):
+    backend = get_backend(backend_name)
+    noise_model = NoiseModel.from_backend(backend)
+    circuits = [ghz_anonymous_circuit(bit, num_parties, sender) for bit in (0, 1)]
+    variants = transpile(circuits, backend, optimization_level=optimization_level,
+                         initial_layout=initial_layout, seed_transpiler=seed_transpiler)
+    index = {p: i for i, p in enumerate(_active_qubits(variants))}
+    noise = _compact_noise_model(noise_model, index)
+    noise["calibration"] = str(backend.properties().last_update_date)
+    return noise, [_compact_circuit(c, index) for c in variants]
+
+
+def load_or_build(backend_name="FakeMarrakesh", optimization_level=3, initial_layout=None,
+                  num_parties=4, sender=0, seed_transpiler=None, cache_dir=CACHE_DIR):
+    """
+    Returns (simulator, variants) where variants[bit] is the transpiled circuit for
+    that secret bit, compacted onto its active physical qubits together with the
+    matching slice of the backend noise model. Looks in memory, then on disk;
+    builds and persists on a miss. The backend is only instantiated on a miss.
+    """
+    key = cache_key(backend_name, optimization_level, initial_layout,
+                    num_parties, sender, seed_transpiler)
+    if key in _MEMORY_CACHE:
+        return _MEMORY_CACHE[key]
+
+    circuit_path, noise_path = _paths(cache_dir, key)
+    if os.path.exists(circuit_path) and os.path.exists(noise_path):
+        with open(circuit_path, "rb") as f:
+            variants = qpy.load(f)
+        with open(noise_path) as f:
+            noise = json.load(f, object_hook=_json_object)
+    else:
+        noise, variants = _build(backend_name, optimization_level, initial_layout,
+                                 num_parties, sender, seed_transpiler)
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(circuit_path, "wb") as f:
+            qpy.dump(variants, f)
+        with open(noise_path, "w") as f:
+            json.dump(noise, f, default=_json_default)
+
+    simulator = AerSimulator(noise_model=_noise_model(noise))
+    _MEMORY_CACHE[key] = (simulator, variants)
+    return simulator, variants
+
+
+def clear_cache(cache_dir=CACHE_DIR):
+    """Drops both the in-process and the on-disk cache."""
+    _MEMORY_CACHE.clear()
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def run_anonymous_cached(sender_bit, shots=1, **kwargs):
+    """QIAPractice3's run_anonymous_marrakesh, served from the cache."""
+    simulator, variants = load_or_build(**kwargs)
+    counts = simulator.run(variants[sender_bit], shots=shots).result().get_counts()
+    outcome_str = list(counts.keys())[0]
+    bits = [int(b) for b in outcome_str]
+    return bits, sum(bits) % 2
+
+
+def parity_success(simulator, circuit, sender_bit, shots=1000):
+    """Fraction of shots whose parity equals the sender's bit."""
+    counts = simulator.run(circuit, shots=shots).result().get_counts()
+    p_one = parities_from_counts([counts])[0]
+    return p_one if sender_bit == 1 else 1 - p_one
+
+
+if __name__ == "__main__":
+    clear_cache()
+
+    # 1. Cold: backend + noise model + transpile + write to disk
+    start = time.time()
+    load_or_build()
+    cold = time.time() - start
+
+    # 2. Warm (new kernel): read circuits and noise model from disk
+    _MEMORY_CACHE.clear()
+    start = time.time()
+    load_or_build()
+    warm_disk = time.time() - start
+
+    # 3. Warm (same kernel): in-memory hit
+    start = time.time()
+    load_or_build()
+    warm_memory = time.time() - start
+
+    print("=" * 40)
+    print("TRANSPILE CACHE (FakeMarrakesh, opt level 3)")
+    print("=" * 40)
+    print(f"Cold:            {cold:.3f} s")
+    print(f"Warm (disk):     {warm_disk:.3f} s")
+    print(f"Warm (memory):   {warm_memory * 1e6:.1f} us")
+    start = time.time()
+    bits, parity = run_anonymous_cached(1)
+    print(f"Round (cached):  {time.time() - start:.3f} s -> {bits}, parity {parity}")
@@ -0,0 +1,170 @@
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+
+# ============================================================
+# TRIAL LOGGING: buffered JSON-lines records, one progress line
+# The bridges printed a line per run; at 10^5 runs the terminal
+# I/O is a visible share of the runtime. A TrialLog instead
+#   - keeps per-trial records (trial index + fields) in a buffer
+#     and hands full batches to a writer thread, which serializes
+#     and appends them to a JSON-lines file (path=None: no file);
+#   - keeps every `sample_every`-th trial only, except records at
+#     WARNING and above, and drops records below `level`;
+#   - redraws one progress line (trials/s, ETA) at most every
+#     `interval_s` on the console, and only once a run is slow
+#     enough to need it;
+#   - sends log() events through the standard logging module too.
+# ============================================================
+
+
+class TrialLog:
+    """Per-trial records for one run of `total` trials (see the module header)."""
+
+    def __init__(self, name, path=None, level=logging.INFO, sample_every=1, total=None, interval_s=1.0,
+                 console=None, batch=4096):
+        self.name, self.path, self.level, self.sample_every = name, path, level, sample_every
+        self.total, self.interval_s, self.batch = total, interval_s, batch
+        self.console = console or sys.stderr
+        self.done, self.kept = 0, 0
+        self._buffer, self._shown = [], False
+        self._start = self._last = time.perf_counter()
+        self._queue, self._writer = queue.Queue(), None
+
+    # ---------------- records ----------------
+    def trial(self, i, level=logging.INFO, **fields):
+        """Record of trial `i`; also advances the progress count."""
+        self.done += 1
+        if self.path is not None and level >= self.level and \
+                (level >= logging.WARNING or i % self.sample_every == 0):
+            self._buffer.append({"trial": i, "level": logging.getLevelName(level), **fields})
+            if len(self._buffer) >= self.batch:
+                self.flush()
+        now = time.perf_counter()
+        if now - self._last >= self.interval_s:
+            self._last = now
+            self._progress(now)
+
+    def log(self, level, msg, **fields):
+        """A run-level event: to the JSON lines (if at or above `level`) and to logging."""
+        if self.path is not None and level >= self.level:
+            self._buffer.append({"event": msg, "level": logging.getLevelName(level), **fields})
+        logging.getLogger(self.name).log(level, msg)
+
+    def flush(self):
+        if self._buffer:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write, args=(self.path,), daemon=True)
+                self._writer.start()
+            self.kept += len(self._buffer)
+            self._queue.put(self._buffer)
+            self._buffer = []
+
+    def close(self):
+        """Flushes, waits for the writer and ends the progress line (the log stays usable)."""
+        self.flush()
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+        if self._shown:
+            self._progress(time.perf_counter())
+            self.console.write("\n")
+            self.console.flush()
+            self._shown = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------------- internals ----------------
+    def _progress(self, now):
+        elapsed = now - self._start
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        line = f"\r{self.name}: {self.done}"
+        if self.total:
+            eta = (self.total - self.done) / rate if rate else float("inf")
+            line += f"/{self.total} trials, {rate:.0f} trials/s, ETA {eta:.0f} s"
+        else:
+            line += f" trials, {rate:.0f} trials/s"
+        self.console.write(line + " " * 4)
+        self.console.flush()
+        self._shown = True
+
+    def _write(self, path):
+        encode = json.JSONEncoder(separators=(",", ":"), default=_plain).encode
+        with open(path, "a") as f:
+            while True:
+                records = self._queue.get()
+                if records is None:
+                    return
+                f.write("\n".join(map(encode, records)) + "\n")
+
+
+def _plain(value):
+    """NumPy scalars and arrays as Python values, anything else as its str()."""
+    return value.tolist() if hasattr(value, "tolist") else str(value)
+
+
+if __name__ == "__main__":
+    import tempfile
+    import numpy as np
+
+    trials = 10 ** 5
+    rng = np.random.default_rng(0)
+    fidelities = rng.uniform(0.9, 1.0, trials)
+    tmp = tempfile.mkdtemp()
+    devnull = open(os.devnull, "w")
+
+    def run(body):
+        start = time.perf_counter()
+        body()
+        return time.perf_counter() - start
+
+    def printed(stream):
+        def body():
+            for i in range(trials):
+                print(f"Run {i}: Corrected Fidelity: {fidelities[i]:.4f}", file=stream)
+        return body
+
+    def logged(**kwargs):
+        def body():
+            with TrialLog("bridge", total=trials, console=devnull, **kwargs) as log:
+                for i in range(trials):
+                    log.trial(i, fidelity=fidelities[i])
+        return body
+
+    bare = run(lambda: [fidelities[i] for i in range(trials)])
+    cases = [("print per run (block-buffered)", printed(open(os.path.join(tmp, "block.txt"), "w"))),
+             ("print per run (line-buffered)", printed(open(os.path.join(tmp, "line.txt"), "w", buffering=1)))]
+    try:   # a pseudo-terminal, drained by a thread: the kernel side of printing to a console
+        import pty
+        master, slave = pty.openpty()
+        threading.Thread(target=lambda: [os.read(master, 1 << 16) for _ in iter(int, 1)], daemon=True).start()
+        cases.append(("print per run (pty)", printed(os.fdopen(slave, "w", buffering=1))))
+    except (ImportError, OSError):
+        pass
+    cases += [
+        ("TrialLog, every trial -> JSON", logged(path=os.path.join(tmp, "all.jsonl"))),
+        ("TrialLog, every 100th -> JSON", logged(path=os.path.join(tmp, "sampled.jsonl"), sample_every=100)),
+        ("TrialLog, progress line only", logged()),
+    ]
+    print("=" * 70)
+    print(f"TRIAL LOGGING: per-trial output overhead over {trials} trials")
+    print("=" * 70)
+    print(f"{'mode':32s} {'total s':>8s} {'us/trial':>9s}")
+    for label, body in cases:
+        overhead = run(body) - bare
+        print(f"{label:32s} {overhead:8.3f} {overhead / trials * 1e6:9.2f}")
+
+    if sys.stderr.isatty():   # what the console shows: one line, redrawn
+        with TrialLog("demo", total=300, interval_s=0.2) as log:
+            for i in range(300):
+                time.sleep(0.005)
+                log.trial(i)
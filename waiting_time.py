@@ -0,0 +1,182 @@
+import time
+import numpy as np
+
+from network_config import load_config, channel_lengths, NS_PER_KM
+from pauli_surrogate import fibre_survival
+
+# ============================================================
+# WAITING-TIME ENGINE for lossy repeater chains
+# (Brand, Coopmans & Elkouss 2020, deterministic swaps)
+# Every span attempts once per slot and succeeds with the
+# FibreLossModel transmission p. Spans are joined pairwise by
+# nested swaps. Joining links A and B:
+#   no cutoff  - T = max(T_A, T_B): P(T <= t) = P_A(t) P_B(t)
+#   cutoff c   - the first link waits at most c slots for the
+#                other; otherwise both are discarded and both
+#                restart. T = F_1 + ... + F_K + S with K geometric,
+#                so its transform is S(w) / (1 - F(w)): one FFT.
+# The success / failure parts S, F come from cumulative sums in
+# O(horizon). Result: the pmf of the time (in slots) until the
+# end-to-end pair exists, its mean rate and percentiles.
+# ============================================================
+
+
+def geometric_pmf(p, horizon):
+    """P(first success at slot t), t = 0..horizon-1 (zero at t = 0)."""
+    t = np.arange(horizon)
+    pmf = np.zeros(horizon)
+    pmf[1:] = p * (1 - p) ** (t[1:] - 1)
+    return pmf
+
+
+def _shift(cdf, k):
+    """cdf(t - k) on the same grid (0 before the start)."""
+    if k <= 0:
+        return cdf
+    return np.concatenate([np.zeros(k), cdf[:-k]])
+
+
+def join(a, b, cutoff=None):
+    """
+    Waiting-time pmf of the link made by swapping links with pmfs `a` and `b`
+    (same horizon). `cutoff` is the memory cutoff in slots (None = unlimited).
+    """
+    A, B = np.cumsum(a), np.cumsum(b)
+    if cutoff is None:
+        return np.diff(A * B, prepend=0.0)
+
+    horizon = len(a)
+    # Success at t = max(T_A, T_B) with |T_A - T_B| <= cutoff (ties count once, on A)
+    success = a * (B - _shift(B, cutoff + 1)) + b * (_shift(A, 1) - _shift(A, cutoff + 1))
+    # Failure: the earlier link (arrived at t - cutoff) times out at t, the other is later still
+    failure = _shift(a, cutoff) * (1 - B) + _shift(b, cutoff) * (1 - A)
+    size = 2 * horizon   # zero padding: the compound sum wraps at most its tail mass
+    pmf = np.fft.irfft(np.fft.rfft(success, size) / (1 - np.fft.rfft(failure, size)), size)
+    return np.clip(pmf, 0.0, None)
+
+
+def _nested(pmfs, cutoff):
+    """Joins neighbouring links level by level (an odd link waits for the next level)."""
+    while len(pmfs) > 1:
+        pairs = [join(pmfs[i], pmfs[i + 1], cutoff) for i in range(0, len(pmfs) - 1, 2)]
+        pmfs = pairs + (pmfs[-1:] if len(pmfs) % 2 else [])
+        horizon = min(len(p) for p in pmfs)
+        pmfs = [p[:horizon] for p in pmfs]
+    return pmfs[0]
+
+
+def chain_waiting_time(lengths=None, p_loss_init=0.1, p_loss_length=0.25, cutoff=None, slot_ns=None,
+                       tol=1e-10):
+    """
+    Distribution of the time until end-to-end entanglement over spans of `lengths` km
+    (default: config.yaml). One attempt per span every `slot_ns` (default: the heralding
+    round trip of the longest span). The horizon doubles until the mass beyond it
+    is below `tol`. Returns a dict with the pmf over slots and the summary in ms.
+    """
+    lengths = channel_lengths(load_config()) if lengths is None else list(lengths)
+    probs = fibre_survival(np.array(lengths), p_loss_init, p_loss_length)
+    slot_ns = 2 * max(lengths) * NS_PER_KM if slot_ns is None else slot_ns
+
+    horizon = 64
+    while True:
+        pmf = _nested([geometric_pmf(p, 2 * horizon) for p in probs], cutoff)
+        if pmf[horizon:].sum() < tol:
+            break
+        horizon *= 2
+    pmf = pmf[:horizon] / pmf[:horizon].sum()
+    return summarize(pmf, slot_ns) | {"span_success": probs, "cutoff": cutoff}
+
+
+def summarize(pmf, slot_ns):
+    """Mean rate and percentiles (ms) of a waiting-time pmf over slots."""
+    t = np.arange(len(pmf))
+    cdf = np.cumsum(pmf)
+    mean_slots = float(t @ pmf)
+    ms = slot_ns / 1e6
+    pct = {f"p{q}_ms": float(np.searchsorted(cdf, q / 100)) * ms for q in (50, 90, 99)}
+    return {"pmf": pmf, "slot_ns": slot_ns, "mean_slots": mean_slots, "mean_ms": mean_slots * ms,
+            "rate_per_s": 1e9 / (mean_slots * slot_ns), **pct}
+
+
+def simulate_waiting_time(lengths=None, p_loss_init=0.1, p_loss_length=0.25, cutoff=None, slot_ns=None,
+                          trials=100000, rng=None):
+    """Monte Carlo of the same nested protocol (vectorized over trials), for validation."""
+    rng = rng or np.random.default_rng()
+    lengths = channel_lengths(load_config()) if lengths is None else list(lengths)
+    probs = fibre_survival(np.array(lengths), p_loss_init, p_loss_length)
+    slot_ns = 2 * max(lengths) * NS_PER_KM if slot_ns is None else slot_ns
+
+    def link(tree, size):
+        if not isinstance(tree, tuple):
+            return rng.geometric(probs[tree], size).astype(float)
+        out, pending = np.zeros(size), np.arange(size)
+        while len(pending):
+            ta, tb = link(tree[0], len(pending)), link(tree[1], len(pending))
+            ok = np.ones(len(pending), dtype=bool) if cutoff is None else np.abs(ta - tb) <= cutoff
+            out[pending[ok]] += np.maximum(ta, tb)[ok]
+            if cutoff is not None:
+                out[pending[~ok]] += np.minimum(ta, tb)[~ok] + cutoff
+            pending = pending[~ok]
+        return out
+
+    trees = list(range(len(probs)))
+    while len(trees) > 1:   # same pairing as _nested
+        trees = [(trees[i], trees[i + 1]) for i in range(0, len(trees) - 1, 2)] + \
+                (trees[-1:] if len(trees) % 2 else [])
+    samples = link(trees[0], trials)
+    return samples * slot_ns / 1e6
+
+
+def netsquid_span_success(length=10, p_loss_init=0.1, p_loss_length=0.25, num_runs=2000):
+    """Fraction of qubits a lossy QuantumChannel delivers, as in the Segment2 bridges."""
+    import netsquid as ns
+    from netsquid.components import QuantumChannel
+    from netsquid.components.models.qerrormodels import FibreLossModel
+
+    ns.sim_reset()
+    chan = QuantumChannel("C", length=length,
+                          models={"loss_model": FibreLossModel(p_loss_init=p_loss_init, p_loss_length=p_loss_length)})
+    received = []
+    chan.ports["recv"].bind_output_handler(lambda message: received.append(message.items[0]))
+    for _ in range(num_runs):
+        chan.send(ns.qubits.create_qubits(1)[0])
+        ns.sim_run()
+    return sum(q is not None for q in received) / num_runs
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(4)
+    trials = 200000
+
+    for lengths in ([10, 10, 10], [25, 25, 25, 25]):
+        print("=" * 86)
+        print(f"WAITING TIME: {len(lengths)} x {lengths[0]} km, FibreLossModel(0.1, 0.25 dB/km), "
+              f"one attempt per {2 * lengths[0] * NS_PER_KM / 1e3:.0f} us slot")
+        print("=" * 86)
+        print(f"{'cutoff':>7s} {'mean ms':>8s} {'p50':>6s} {'p90':>6s} {'p99':>6s} {'rate/s':>8s} "
+              f"{'engine ms':>10s} {'MC mean ms':>17s} {'MC p99':>7s} {'MC ms':>7s}")
+        for cutoff in (None, 16, 4, 2, 1, 0):
+            start = time.perf_counter()
+            res = chain_waiting_time(lengths, cutoff=cutoff)
+            engine_ms = (time.perf_counter() - start) * 1e3
+            start = time.perf_counter()
+            mc = simulate_waiting_time(lengths, cutoff=cutoff, trials=trials, rng=rng)
+            mc_ms = (time.perf_counter() - start) * 1e3
+            stderr = mc.std() / np.sqrt(trials)
+            print(f"{str(cutoff):>7s} {res['mean_ms']:8.3f} {res['p50_ms']:6.2f} {res['p90_ms']:6.2f} "
+                  f"{res['p99_ms']:6.2f} {res['rate_per_s']:8.0f} {engine_ms:10.2f} "
+                  f"{mc.mean():9.4f}+-{stderr:.4f} {np.percentile(mc, 99, method='inverted_cdf'):7.2f} {mc_ms:7.0f}")
+
+    # The bridges' estimate: 20 runs of one attempt each
+    p_one = chain_waiting_time()["pmf"][1]
+    runs = rng.binomial(20, p_one, size=1000) / 20
+    print(f"P(end-to-end in one attempt) = {p_one:.4f}; 20-run Monte Carlo spread: "
+          f"{runs.mean():.3f} +- {runs.std():.3f}")
+
+    for length in (10, 25, 50):
+        line = f"{length:3d} km span: p = {fibre_survival(length, 0.1, 0.25):.4f}"
+        try:
+            line += f", NetSquid {netsquid_span_success(length):.4f}"
+        except ImportError:
+            pass
+        print(line)